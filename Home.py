@@ -1,6 +1,8 @@
 import streamlit as st
 from streamlit_extras.stylable_container import stylable_container
 from utils.style import apply_custom_style
+from utils.prefetch import start_background_prefetch
+from utils.assets import responsive_image
 
 # --- 1. Theme & Page Config ---
 if "theme" not in st.session_state:
@@ -15,19 +17,10 @@ st.set_page_config(
 
 apply_custom_style(st.session_state.theme)
 
-# --- 2. Custom Sidebar Style (color & width) ---
-
+# 데이터셋을 백그라운드에서 미리 내려받음 (프로세스당 한 번)
+start_background_prefetch()
 
 # --- 3. Sidebar Navigation ---
-hide_pages_nav = """
-<style>
-    div[data-testid="stSidebarNav"] {
-        display: none;
-    }
-</style>
-"""
-st.markdown(hide_pages_nav, unsafe_allow_html=True)
-
 with st.sidebar:
     st.title("K-소설 해외진출 나침반 🧭")
     # Add new homepage link at the top
@@ -46,7 +39,7 @@ st.markdown("""
 
 # --- 5. Bookshelf Image and Overlay Buttons ---
 st.markdown('<div style="height:18px"></div>', unsafe_allow_html=True)
-st.image("images/bookshelf.png", use_container_width=True, width=900)  
+responsive_image("images/bookshelf.png", alt="Bookshelf")
 
 # --- 6. Overlay Buttons using Columns ---
 # Adjust the column ratios to match the book positions visually
@@ -2,9 +2,19 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from st_keyup import st_keyup
-from utils.data_loader import load_data
+from utils.registry import get_dataset
+from utils.search import get_ranked_search_index
+from utils.ranking import RANKED_FILE, get_ranking_view, page_count, page_window
+from utils.isbn_index import get_isbn_index
+from utils.kpi import format_metric, get_kpis
+from utils.figure_cache import cached_figure
+from utils.image_cache import cover_src, prefetch_covers
+from utils.topsis import (
+    CRITERIA as TOPSIS_CRITERIA, DEFAULT_WEIGHTS, LINGUISTIC_WEIGHTS,
+    capped_samples, get_rank_stability, model_calibrated, ranked_scores
+)
 from utils.style import apply_custom_style
-from collections import Counter
+from utils.taxonomy import GENRE, GENRE_SHORT
 from streamlit_extras.stylable_container import stylable_container
 import plotly.io as pio
 
@@ -29,11 +39,9 @@ else:
     pio.templates.default = "plotly_dark"
 
 # --- 3. DATA LOADING ---
-df_ranked = load_data('흥행예측도서_ranked.csv')
-df_translated = load_data('trans_final_with_url.csv')
-df_book_korean = load_data('book_korean.csv')
-df_nyb = load_data('nyt_bestseller_with_keyword.csv')
-df_imdb = load_data("imdb_llm_filtered_final.csv")
+df_ranked = get_dataset(RANKED_FILE)
+df_nyb = get_dataset('nyt_bestseller_with_keyword.csv', columns=['primary_genre'])
+df_imdb = get_dataset("imdb_llm_filtered_final.csv", columns=['primary_genre'])
 
 # --- 4. SESSION STATE INITIALIZATION ---
 if 'selected_book_isbn' not in st.session_state:
@@ -41,17 +49,7 @@ if 'selected_book_isbn' not in st.session_state:
 
 
 
-
 # --- 5. SIDEBAR / NAVIGATOR ---
-hide_pages_nav = """
-<style>
-    div[data-testid="stSidebarNav"] {
-        display: none;
-    }
-</style>
-"""
-st.markdown(hide_pages_nav, unsafe_allow_html=True)
-
 with st.sidebar:
     st.title("K-소설 해외진출 나침반 🧭")
     # Add new homepage link at the top
@@ -68,99 +66,74 @@ st.divider()
 # --- 7. ROW 1: DYNAMIC METRIC CARDS ---
 st.subheader("흥행 예측 핵심 지표")
 
-# --- NEW: Add a button to toggle all expanders ---
-if 'expand_all_metrics' not in st.session_state:
-    st.session_state.expand_all_metrics = False
-
-if st.button("지표 설명 모두 보기/접기", key="trans_expand"):
-    st.session_state.expand_all_metrics = not st.session_state.expand_all_metrics
-
-# --- REVISED: Create a structured list of metrics ---
-if not df_ranked.empty and not df_translated.empty and not df_book_korean.empty:
-    translated_count = df_translated['ISBN_K'].nunique()
-    untranslated_count = df_book_korean['ISBN'].nunique()
-    total_books = translated_count + untranslated_count
-    translation_percentage = (translated_count / total_books) * 100 if total_books > 0 else 0
-    success_count = df_ranked['ISBN'].nunique()
-    success_percentage = (success_count/(success_count + untranslated_count)) * 100
-    avg_final_score = df_ranked['fuzzy_topsis_score'].mean()
-    avg_salespoint = df_translated['salespoint'].mean()
-    success_salespoint = df_ranked['salespoint'].mean()
-    avg_similarity = df_translated['top_1_similarity'].mean()
-    success_nyb_max_s = df_ranked['nyb_max_s'].mean()
-else:
-    translation_percentage, avg_final_score, avg_salespoint, avg_similarity = 0, 0, 0, 0
-
-metrics = [
-    {
-        "label": "흥행 예측도서 비율",
-        "value": f"{success_percentage:.2f}%",
-        "expander": """
-        - **설명:** 번역되지 않은 전체 한국소설 중, 해외 흥행이 예측된 도서의 비율입니다.
-        - **의미:** 이 비율이 높을수록 해외 흥행이 예측된 K-소설의 비중이 크다는 것을 의미합니다.
-        """
-    },
-    {
-        "label": "흥행 예측지수 평균",
-        "value": f"{avg_final_score:.2f} / 1",
-        "expander": """
-        - **설명:** 다양한 지표(판매량, 평점, 유사도 등)를 종합하여 산출한 흥행 예측 점수입니다.
-        - **의미:** 점수가 1에 가까울수록 해외 시장에서의 흥행 가능성이 높음을 시사합니다.
-        """
-    },
-    {
-        "label": "흥행 예측도서 판매지수 평균",
-        "value": f"{success_salespoint:,.0f} pts",
-        "expander": """
-        - **설명:** 흥행 성공이 예측된 도서들의 평균 판매지수로, 알라딘에서 각 도서의 인기도와 판매 추이를 수치로 나타내는 고유한 판매 지수입니다.
-        - **의미:** 판매지수가 높을수록 시장 반응이 좋음을 의미합니다.
-        """
-    },
-    {
-        "label": "흥행 예측도서 vs NYT 베스트셀러 유사도",
-        "value": f"{success_nyb_max_s:.2f} / 1",
-        "expander": """
-        - **설명:** 흥행 예측도서와 뉴욕타임즈 베스트셀러 간의 내용적 유사도를 나타냅니다. **유사도**란 도서의 설명에 포함된 장르, 배경, 캐릭터, 분위기, 전개 등 도서 내용 및 의미가 유사한 정도를 수치화한 지수입니다.
-        - **의미:** 수치가 높을수록 미국 주류 시장의 독자 취향과 부합할 가능성이 큽니다.
-        """
-    }
-]
-
-cols = st.columns(len(metrics))
-for i, metric in enumerate(metrics):
-    with cols[i]:
-        st.markdown(
-            f'''
-            <div class="metric-card">
-                <div class="metric-card-label">{metric["label"]}</div>
-                <div class="metric-card-value">{metric["value"]}</div>
-            </div>
-            ''', unsafe_allow_html=True
-        )
-        # --- NEW: Add the expander for each metric ---
-        with st.expander("설명 보기", expanded=st.session_state.get('expand_all_metrics', False)):
-            st.markdown(metric["expander"])
+# 설명 토글 버튼은 카드 영역만 다시 실행
+@st.fragment
+def metric_cards_section():
+    # --- NEW: Add a button to toggle all expanders ---
+    if 'expand_all_metrics' not in st.session_state:
+        st.session_state.expand_all_metrics = False
+
+    if st.button("지표 설명 모두 보기/접기", key="trans_expand"):
+        st.session_state.expand_all_metrics = not st.session_state.expand_all_metrics
+
+    # --- REVISED: Create a structured list of metrics ---
+    kpis = get_kpis()
+
+    metrics = [
+        {
+            "label": "흥행 예측도서 비율",
+            "value": format_metric(kpis["success_percentage"], ".2f", "{}%"),
+            "expander": """
+            - **설명:** 번역되지 않은 전체 한국소설 중, 해외 흥행이 예측된 도서의 비율입니다.
+            - **의미:** 이 비율이 높을수록 해외 흥행이 예측된 K-소설의 비중이 크다는 것을 의미합니다.
+            """
+        },
+        {
+            "label": "흥행 예측지수 평균",
+            "value": format_metric(kpis["ranked_score_mean"], ".2f", "{} / 1"),
+            "expander": """
+            - **설명:** 다양한 지표(판매량, 평점, 유사도 등)를 종합하여 산출한 흥행 예측 점수입니다.
+            - **의미:** 점수가 1에 가까울수록 해외 시장에서의 흥행 가능성이 높음을 시사합니다.
+            """
+        },
+        {
+            "label": "흥행 예측도서 판매지수 평균",
+            "value": format_metric(kpis["ranked_salespoint_mean"], ",.0f", "{} pts"),
+            "expander": """
+            - **설명:** 흥행 성공이 예측된 도서들의 평균 판매지수로, 알라딘에서 각 도서의 인기도와 판매 추이를 수치로 나타내는 고유한 판매 지수입니다.
+            - **의미:** 판매지수가 높을수록 시장 반응이 좋음을 의미합니다.
+            """
+        },
+        {
+            "label": "흥행 예측도서 vs NYT 베스트셀러 유사도",
+            "value": format_metric(kpis["ranked_nyb_max_s_mean"], ".2f", "{} / 1"),
+            "expander": """
+            - **설명:** 흥행 예측도서와 뉴욕타임즈 베스트셀러 간의 내용적 유사도를 나타냅니다. **유사도**란 도서의 설명에 포함된 장르, 배경, 캐릭터, 분위기, 전개 등 도서 내용 및 의미가 유사한 정도를 수치화한 지수입니다.
+            - **의미:** 수치가 높을수록 미국 주류 시장의 독자 취향과 부합할 가능성이 큽니다.
+            """
+        }
+    ]
 
+    cols = st.columns(len(metrics))
+    for i, metric in enumerate(metrics):
+        with cols[i]:
+            st.markdown(
+                f'''
+                <div class="metric-card">
+                    <div class="metric-card-label">{metric["label"]}</div>
+                    <div class="metric-card-value">{metric["value"]}</div>
+                </div>
+                ''', unsafe_allow_html=True
+            )
+            # --- NEW: Add the expander for each metric ---
+            with st.expander("설명 보기", expanded=st.session_state.get('expand_all_metrics', False)):
+                st.markdown(metric["expander"])
 
-# --- 8. ROW 2: INTERACTIVE RANKING LIST AND DETAILS PANEL ---
-st.subheader("흥행예측도서 순위")
+metric_cards_section()
 
-# --- STEP 1: Define all mappings first for easy management ---
-genre_emoji_map = {
-    'Thriller': '🔪', 'Mystery': '🔍', 'Crime Fiction': '⚖️', 'Suspense': '⏳', 'Romance': '❤️',
-    'Fantasy': '✨', 'Magical Realism': '🧙‍♂️', 'Mythic Fiction': '🧚‍♀️', 'Adventure': '🗺️',
-    'Historical Fiction': '🏛️', 'Historical & Political Fiction': '🏛️', 'Science Fiction': '🚀',
-    'Philosophical Fiction': '🤔', 'Contemporary Fiction': '🏙️', 'Literary Fiction': '📖',
-    'Family_Saga': '👨‍👩‍👧‍👦', 'Coming-of-Age': '🌱'
-}
 
-genre_kor_map = {
-    'Thriller': '스릴러', 'Mystery': '미스터리', 'Crime Fiction': '범죄소설', 'Suspense': '서스펜스', 'Romance': '로맨스',
-    'Fantasy': '판타지', 'Magical Realism': '마술적 사실주의', 'Mythic Fiction': '신화소설', 'Adventure': '모험',
-    'Historical Fiction': '역사소설', 'Historical & Political Fiction': '역사/정치소설', 'Science Fiction': 'SF',
-    'Philosophical Fiction': '철학소설', 'Contemporary Fiction': '현대소설', 'Literary Fiction': '문학소설',
-    'Family_Saga': '가족서사', 'Coming-of-Age': '성장소설'
-}
+# --- 8. ROW 2: INTERACTIVE RANKING LIST AND DETAILS PANEL ---
+st.subheader("흥행예측도서 순위")
 
 # Labels for dataframe columns and sorting options
 display_labels = {
@@ -178,231 +151,231 @@ display_labels = {
 
 sort_cols = ['fuzzy_rank', 'salespoint', 'nyb_max_s', 'nyt_genre_score','imdb_genre_score', 'fuzzy_topsis_score']
 
-col_rank, col_detail = st.columns([2, 1])
-
-with col_rank:
-    search_query = st_keyup("🔍 도서 검색 (제목, 저자, ISBN)", debounce=500, key="book_search")
-    if search_query:
-        search_filtered_df = df_ranked[
-            df_ranked['제목'].str.contains(search_query, case=False, na=False) |
-            df_ranked['저자'].str.contains(search_query, case=False, na=False) |
-            df_ranked['ISBN'].astype(str).str.contains(search_query, case=False, na=False)
-        ]
-    else:
-        search_filtered_df = df_ranked
-
-    col_sort_1, col_sort_2 = st.columns([2, 1])
-    with col_sort_1:
-        # --- STEP 2: Modify the selectbox to show Korean labels ---
-        # The user sees Korean, but `sort_by` variable will hold the English key for sorting
-        sort_by = st.selectbox(
-            "정렬 기준 (Sort by)",
-            options=sort_cols,
-            format_func=lambda x: display_labels.get(x, x),  # Show Korean label
-            index=0
-        )
-    with col_sort_2:
-        order = st.radio("정렬 순서", ["오름차순", "내림차순"], horizontal=True)
-        is_ascending = "오름차순" in order
-
-    # --- STEP 3: Modify pills to show Korean genre names ---
-    if 'primary_genre' in df_ranked.columns:
-        unique_genres = sorted(df_ranked['primary_genre'].dropna().unique().tolist())
-        selected_genres = st.pills(
-            "장르 필터 (Filter by Genre)",
-            options=unique_genres,
-            format_func=lambda x: f"{genre_emoji_map.get(x, '📚')} {genre_kor_map.get(x, x)}", # Use Korean map
-            selection_mode="multi"
-        )
-        if selected_genres:
-            final_filtered_df = search_filtered_df[search_filtered_df['primary_genre'].isin(selected_genres)]
+# 정렬 순열/장르 마스크/표시용 프레임은 한 번만 만들어 재사용
+ranking_view = get_ranking_view(
+    genre_labels=GENRE.label_map(missing_emoji='📚'),
+    display_labels=display_labels
+)
+
+def reset_topsis_weights():
+    for criterion in TOPSIS_CRITERIA:
+        st.session_state[f"topsis_weight_{criterion}"] = DEFAULT_WEIGHTS[criterion]
+
+# 검색/정렬/필터/행 선택은 순위표와 상세 패널만 다시 실행
+@st.fragment
+def ranking_section(ranking_view):
+    col_rank, col_detail = st.columns([2, 1])
+
+    with col_rank:
+        search_query = st_keyup("🔍 도서 검색 (제목, 저자, ISBN)", debounce=500, key="book_search")
+        # 미리 만들어 둔 n-gram 인덱스로 검색 (매 입력마다 전체 스캔하지 않음)
+        search_rows = get_ranked_search_index().search(search_query) if search_query else None
+
+        col_sort_1, col_sort_2 = st.columns([2, 1])
+        with col_sort_1:
+            # --- STEP 2: Modify the selectbox to show Korean labels ---
+            # The user sees Korean, but `sort_by` variable will hold the English key for sorting
+            sort_by = st.selectbox(
+                "정렬 기준 (Sort by)",
+                options=sort_cols,
+                format_func=lambda x: display_labels.get(x, x),  # Show Korean label
+                index=0,
+                key="ranking_sort_by"
+            )
+        with col_sort_2:
+            order = st.radio("정렬 순서", ["오름차순", "내림차순"], horizontal=True, key="ranking_order")
+            is_ascending = "오름차순" in order
+
+        # --- STEP 3: Modify pills to show Korean genre names ---
+        selected_genres = None
+        if ranking_view.genres:
+            selected_genres = st.pills(
+                "장르 필터 (Filter by Genre)",
+                options=ranking_view.genres,
+                format_func=lambda x: GENRE.label(x, missing_emoji='📚'), # Use Korean map
+                selection_mode="multi",
+                key="ranking_genre_filter"
+            )
         else:
-            final_filtered_df = search_filtered_df
-    else:
-        final_filtered_df = search_filtered_df
-        st.warning("`primary_genre` 컬럼을 찾을 수 없어 장르 필터를 비활성화합니다.")
-
-    # --- STEP 4: Translate dataframe content and headers before display ---
-    display_cols = ['fuzzy_rank', '제목', '저자', 'primary_genre', 'salespoint', 'nyb_max_s', 'nyt_genre_score', 'imdb_genre_score','fuzzy_topsis_score', 'ISBN']
-
-    if not final_filtered_df.empty:
-        # Sort the original filtered dataframe
-        df_sorted_original = final_filtered_df.sort_values(by=sort_by, ascending=is_ascending).reset_index(drop=True)
-
-        # Create a copy for display purposes
-        df_to_display = df_sorted_original[display_cols].copy()
-
-        # Translate genre content to Korean + Emoji
-        df_to_display['primary_genre'] = df_to_display['primary_genre'].map(
-            lambda x: f"{genre_emoji_map.get(x, '📚')} {genre_kor_map.get(x, x)}" if pd.notna(x) else x
-        )
-        
-        # Translate column headers to Korean
-        df_to_display.columns = [display_labels.get(col, col) for col in df_to_display.columns]
-
-    
-        # Display the translated dataframe
-        selection = st.dataframe(
-            df_to_display,
-            height = 500, 
-            on_select="rerun",
-            selection_mode="single-row",
-            hide_index=True,
-            use_container_width=True,
-            column_config={
-                "NYT 유사도": st.column_config.NumberColumn(format="%.2f"),
-                "IMDB 유사도": st.column_config.NumberColumn(format="%.2f"),
-                "종합 평가 점수": st.column_config.NumberColumn(format="%.2f"),
-            }
-        )
-
-        # Get selected ISBN from the original sorted dataframe to ensure correctness
-        if selection.selection.rows:
-            selected_row_index = selection.selection.rows[0]
-            st.session_state.selected_book_isbn = df_sorted_original.iloc[selected_row_index]['ISBN']
-    else:
-        st.info("검색 또는 필터링 결과가 없습니다.")
-
-with col_detail:
-    if st.session_state.selected_book_isbn:
-        book_data = df_ranked[df_ranked['ISBN'] == st.session_state.selected_book_isbn]
-        if not book_data.empty:
-            book = book_data.iloc[0]
-            image_url = book.get('image_url', '')
-            title = book.get('제목', 'N/A')
-            author = book.get('저자', 'N/A')
-            pub_year_val = book.get('발행년도')
-            pub_year = str(int(pub_year_val)) if pd.notna(pub_year_val) else 'N/A'
-            isbn = book.get('ISBN', 'N/A')
-            genre_eng = book.get('primary_genre', 'N/A')
-            genre_kor = genre_kor_map.get(genre_eng, genre_eng)
-            score_val = book.get('fuzzy_topsis_score')
-            score = f"{score_val:.2f}" if pd.notna(score_val) else 'N/A'
-            description = book.get('description', '소개 정보가 없습니다.')
-
-            # --- CHANGE: Improved details card styling ---
-            st.markdown(f"""
-            <div class="details-card-window">
-                <div class="details-card-content">
-                    <div class="details-card-img-wrap">
-                        <img src="{image_url if pd.notna(image_url) else ''}" class="details-card-img" alt="Book Cover">
-                    </div>
-                    <div class="details-card-title">{title}</div>
-                    <div class="details-card-meta"><b>저자:</b> {author}</div>
-                    <div class="details-card-meta"><b>발행년도:</b> {pub_year}</div>
-                    <div class="details-card-meta"><b>ISBN:</b> {isbn}</div>
-                    <div class="details-card-meta"><b>장르:</b> {genre_kor}</div>
-                    <div class="details-card-meta"><b>최종 흥행 예측 지수:</b> {score}</div>
-                    <div class="details-card-desc">{description}</div>
-                </div>
-            </div>""", unsafe_allow_html=True)
-    else:
-        # --- CHANGE: Styled placeholder card ---
-        with stylable_container(
-            key="placeholder_card",
-            css_styles="""
-            .content-card {
-                height: 800px;
-                display: flex;
-                align-items: center;
-                justify-content: center;
-            }
-            """
-        ):
-            st.markdown(
-                '<div class="content-card placeholder-card">'
-                '흥행예측도서 순위 리스트에서<br>상세정보를 조회하고자 하는 도서를 클릭해주세요.'
-                '</div>', 
-                unsafe_allow_html=True
+            st.warning("`primary_genre` 컬럼을 찾을 수 없어 장르 필터를 비활성화합니다.")
+
+        # 평가 기준 가중치를 바꾸면 종합 평가 점수/순위를 퍼지 TOPSIS로 다시 계산
+        with st.expander("⚖️ 종합 평가 가중치 조정"):
+            st.button("기본 가중치로 되돌리기", on_click=reset_topsis_weights, key="topsis_reset")
+            weight_cols = st.columns(len(TOPSIS_CRITERIA))
+            topsis_weights = {}
+            for criterion, weight_col in zip(TOPSIS_CRITERIA, weight_cols):
+                weight_key = f"topsis_weight_{criterion}"
+                if weight_key not in st.session_state:
+                    st.session_state[weight_key] = DEFAULT_WEIGHTS[criterion]
+                with weight_col:
+                    topsis_weights[criterion] = st.select_slider(
+                        display_labels.get(criterion, criterion),
+                        options=list(LINGUISTIC_WEIGHTS),
+                        key=weight_key
+                    )
+        # 기본 가중치면 배포된 점수/순위, 가중치를 바꿨을 때만 앱에서 다시 계산
+        custom_scores = ranked_scores(topsis_weights)
+        if custom_scores is not None:
+            ranking_view = ranking_view.rescored(custom_scores)
+            if model_calibrated():
+                st.caption("순위와 종합 평가 점수는 선택한 가중치로 앱에서 다시 계산한 값입니다.")
+            else:
+                st.warning("앱 계산 모델이 아직 배포된 점수와 보정되지 않았습니다. "
+                           "바꾼 가중치의 순위와 점수는 참고용이며, 기본 가중치로 되돌리면 배포된 순위를 표시합니다.")
+        # 앱에서 다시 계산한 컬럼은 이름으로 구분
+        computed_labels = {
+            display_labels[c]: f"{display_labels[c]} (앱 계산)" for c in ('fuzzy_rank', 'fuzzy_topsis_score')
+        } if custom_scores is not None else {}
+        score_label = computed_labels.get(display_labels['fuzzy_topsis_score'], display_labels['fuzzy_topsis_score'])
+
+        # 가중치 불확실성에 대한 순위 안정성 (실행 버튼을 눌렀을 때만 계산)
+        weight_terms = tuple(topsis_weights[c] for c in TOPSIS_CRITERIA)
+        with st.expander("📊 순위 안정성 분석"):
+            st.caption("현재 가중치 주변에서 가중치를 무작위로 바꿔 가며 퍼지 TOPSIS 순위를 다시 매긴 결과입니다. 순위 범위에는 항상 순위표의 순위가 포함됩니다.")
+            col_top_n, col_samples, col_run = st.columns([1, 1, 1], vertical_alignment="bottom")
+            with col_top_n:
+                stability_top_n = st.number_input("상위 N위", min_value=1, max_value=100, value=10, key="stability_top_n")
+            with col_samples:
+                stability_samples = st.selectbox("가중치 표본 수", [500, 1000, 2000], key="stability_samples")
+            with col_run:
+                if st.button("분석 실행", key="stability_run"):
+                    st.session_state.stability_request = (weight_terms, stability_samples, stability_top_n)
+        stability = None
+        stability_request = st.session_state.get('stability_request')
+        if stability_request and stability_request[0] == weight_terms:
+            with st.spinner("순위 안정성 계산 중..."):
+                stability = get_rank_stability(*stability_request)
+            used_samples = capped_samples(len(stability), stability_request[1])
+            if used_samples < stability_request[1]:
+                st.caption(f"도서 수가 많아 가중치 표본을 {used_samples:,}개로 줄여 계산했습니다.")
+
+        # --- STEP 4: Slice the precomputed display frame by the sorted, filtered row order ---
+        row_order = ranking_view.order(sort_by, is_ascending, rows=search_rows, genres=selected_genres)
+
+        # 검색/정렬/필터/가중치 조건이 바뀌면 첫 페이지로 이동
+        view_signature = (search_query, sort_by, is_ascending, tuple(selected_genres or ()),
+                          tuple(topsis_weights.values()))
+        if st.session_state.get('ranking_view_signature') != view_signature:
+            st.session_state.ranking_view_signature = view_signature
+            st.session_state.ranking_page = 1
+
+        if len(row_order):
+            # Only the visible page of rows is sent to the browser
+            page_rows, page_start = page_window(row_order, st.session_state.get('ranking_page', 1))
+            page_frame = ranking_view.frame(page_rows).rename(columns=computed_labels)
+            stability_column = None
+            if stability is not None:
+                stability_column = f"Top-{stability_request[2]} 확률"
+                page_stats = stability.iloc[page_rows]
+                page_frame = page_frame.assign(**{
+                    "순위 범위": [f"{lo}–{hi}" for lo, hi in zip(page_stats['rank_min'], page_stats['rank_max'])],
+                    stability_column: page_stats['top_n_prob'].to_numpy() * 100,
+                })
+            selection = st.dataframe(
+                page_frame,
+                height = 500, 
+                on_select="rerun",
+                selection_mode="single-row",
+                hide_index=True,
+                use_container_width=True,
+                column_config={
+                    "NYT 유사도": st.column_config.NumberColumn(format="%.2f"),
+                    "IMDB 유사도": st.column_config.NumberColumn(format="%.2f"),
+                    score_label: st.column_config.NumberColumn(format="%.2f"),
+                    **({stability_column: st.column_config.ProgressColumn(format="%.0f%%", min_value=0, max_value=100)}
+                       if stability_column else {}),
+                }
             )
 
-st.divider()
-
-#장르별 색상 지정 -> 위에서 imdb랑 다르게 mapping 해서 영어로 색상 지정 
-
-
-# 장르 분석 파트 생성
-genre_kor_map = {
-    'Thriller': '스릴러', 'Mystery': '미스터리', 'Crime Fiction': '범죄소설', 'Suspense': '서스펜스', 'Romance': '로맨스',
-    'Fantasy': '판타지', 'Magical Realism': '마술적 사실주의', 'Mythic Fiction': '신화소설', 'Adventure': '모험',
-    'Historical Fiction': '역사소설', 'Historical & Political Fiction': '역사/정치소설', 'Science Fiction': 'SF',
-    'Philosophical Fiction': '철학소설', 'Contemporary Fiction': '현대소설', 'Literary Fiction': '문학소설',
-    'Family_Saga': '가족서사', 'Coming-of-Age': '성장소설' 
-}
-
-genre_kor_map_imdb = {
-    'Thriller': '스릴러', 'Mystery': '미스터리', 'Crime Fiction': '범죄', 'Suspense': '서스펜스', 'Romance': '로맨스',
-    'Fantasy': '판타지', 'Magical Realism': '마술적 사실주의', 'Mythic Fiction': '신화', 'Adventure': '모험',
-    'Historical Fiction': '역사', 'Historical & Political Fiction': '역사/정치', 'Science Fiction': 'SF',
-    'Philosophical Fiction': '철학', 'Contemporary Fiction': '현대', 'Literary Fiction': '문학',
-    'Family_Saga': '가족서사', 'Coming-of-Age': '성장' 
-}
-
-
-genre_emoji_map = {
-    'Thriller': '🔪', 'Mystery': '🔍', 'Crime Fiction': '⚖️', 'Suspense': '⏳', 'Romance': '❤️',
-    'Fantasy': '✨', 'Magical Realism': '🧙‍♂️', 'Mythic Fiction': '🧚‍♀️', 'Adventure': '🗺️',
-    'Historical Fiction': '🏛️', 'Historical & Political Fiction': '🏛️', 'Science Fiction': '🚀',
-    'Philosophical Fiction': '🤔', 'Contemporary Fiction': '🏙️', 'Literary Fiction': '📖',
-    'Family_Saga': '👨‍👩‍👧‍👦', 'Coming-of-Age': '🌱'
-}
-# --- 색상 지정  --- 참고용 
-custom_palette = [
-              "#A3C9A8", "#84B1BE", "#F2D388", "#C98474", "#8E7DBE",
-              "#F5B7B1", "#AED6F1", "#F9E79F", "#D7BDE2", "#A2D9CE",
-              "#FADBD8", "#F5CBA7", "#D2B4DE", "#A9CCE3", "#A3E4D7"
-]
-
-genre_color_map = {
-    "🔪 스릴러": "#A3C9A8",
-    "🔍 미스터리": "#84B1BE",
-    "⚖️ 범죄소설": "#F2D388",
-    "⏳ 서스펜스": "#C98474",
-    "❤️ 로맨스": "#8E7DBE",
-    "✨ 판타지": "#F5B7B1",
-    "🧙‍♂️ 마술적 사실주의": "#AED6F1",
-    "🧚‍♀️ 신화소설": "#F9E79F",
-    "🗺️ 모험": "#D7BDE2",
-    "🏛️ 역사소설": "#A2D9CE",
-    "🏛️ 역사/정치소설": "#FADBD8",
-    "🚀 SF": "#F5CBA7",
-    "🤔 철학소설": "#D2B4DE",
-    "🏙️ 현대소설": "#A9CCE3",
-    "📖 문학소설": "#A3E4D7",
-    "👨‍👩‍👧‍👦 가족서사": "#B7B7B7",
-    "🌱 성장소설": "#FFD700"
-}
-
-
-genre_color_map_imdb = {
-    "🔪 스릴러": "#A3C9A8",
-    "🔍 미스터리": "#84B1BE",
-    "⚖️ 범죄": "#F2D388",
-    "⏳ 서스펜스": "#C98474",
-    "❤️ 로맨스": "#8E7DBE",
-    "✨ 판타지": "#F5B7B1",
-    "🧙‍♂️ 마술적 사실주의": "#AED6F1",
-    "🧚‍♀️ 신화": "#F9E79F",
-    "🗺️ 모험": "#D7BDE2",
-    "🏛️ 역사": "#A2D9CE",
-    "🏛️ 역사/정치": "#FADBD8",
-    "🚀 SF": "#F5CBA7",
-    "🤔 철학": "#D2B4DE",
-    "🏙️ 현대": "#A9CCE3",
-    "📖 문학": "#A3E4D7",
-    "👨‍👩‍👧‍👦 가족서사": "#B7B7B7",
-    "🌱 성장": "#FFD700"
-}
+            col_page, col_page_info = st.columns([1, 3])
+            with col_page:
+                st.number_input(
+                    "페이지",
+                    min_value=1,
+                    max_value=page_count(len(row_order)),
+                    step=1,
+                    key="ranking_page"
+                )
+            with col_page_info:
+                st.caption(f"전체 {len(row_order):,}권 중 {page_start + 1:,}–{page_start + len(page_rows):,}위 표시")
+
+            # Resolve the selected ISBN through the same row order to ensure correctness
+            if selection.selection.rows:
+                selected_row_index = selection.selection.rows[0]
+                st.session_state.selected_book_isbn = ranking_view.isbn[page_rows[selected_row_index]]
+        else:
+            st.info("검색 또는 필터링 결과가 없습니다.")
+
+    with col_detail:
+        if st.session_state.selected_book_isbn:
+            book = get_isbn_index().get(RANKED_FILE, st.session_state.selected_book_isbn)
+            if book is not None:
+                image_url = book.get('image_url', '')
+                # 상세 카드 표지를 로컬 썸네일로 받아 둔 뒤 그림 (2, 3페이지와 같은 방식)
+                prefetch_covers([image_url])
+                title = book.get('제목', 'N/A')
+                author = book.get('저자', 'N/A')
+                pub_year_val = book.get('발행년도')
+                pub_year = str(int(pub_year_val)) if pd.notna(pub_year_val) else 'N/A'
+                isbn = book.get('ISBN', 'N/A')
+                genre_eng = book.get('primary_genre', 'N/A')
+                genre_kor = GENRE.label(genre_eng, style="kor")
+                score_val = book.get('fuzzy_topsis_score')
+                score_title = "최종 흥행 예측 지수"
+                if ranking_view.scores is not None:
+                    # 가중치를 바꿨으면 순위표와 같은 앱 계산 점수
+                    score_val = ranking_view.scores[
+                        get_isbn_index().position(RANKED_FILE, st.session_state.selected_book_isbn)
+                    ]
+                    score_title = "흥행 예측 지수 (앱 계산)"
+                score = f"{score_val:.2f}" if pd.notna(score_val) else 'N/A'
+                description = book.get('description', '소개 정보가 없습니다.')
+
+                # --- CHANGE: Improved details card styling ---
+                st.markdown(f"""
+                <div class="details-card-window">
+                    <div class="details-card-content">
+                        <div class="details-card-img-wrap">
+                            <img src="{cover_src(image_url)}" class="details-card-img" alt="Book Cover">
+                        </div>
+                        <div class="details-card-title">{title}</div>
+                        <div class="details-card-meta"><b>저자:</b> {author}</div>
+                        <div class="details-card-meta"><b>발행년도:</b> {pub_year}</div>
+                        <div class="details-card-meta"><b>ISBN:</b> {isbn}</div>
+                        <div class="details-card-meta"><b>장르:</b> {genre_kor}</div>
+                        <div class="details-card-meta"><b>{score_title}:</b> {score}</div>
+                        <div class="details-card-desc">{description}</div>
+                    </div>
+                </div>""", unsafe_allow_html=True)
+        else:
+            # --- CHANGE: Styled placeholder card ---
+            with stylable_container(
+                key="placeholder_card",
+                css_styles="""
+                .content-card {
+                    height: 800px;
+                    display: flex;
+                    align-items: center;
+                    justify-content: center;
+                }
+                """
+            ):
+                st.markdown(
+                    '<div class="content-card placeholder-card">'
+                    '흥행예측도서 순위 리스트에서<br>상세정보를 조회하고자 하는 도서를 클릭해주세요.'
+                    '</div>', 
+                    unsafe_allow_html=True
+                )
+
+ranking_section(ranking_view)
 
-# --- 한글+이모지 매핑 함수 ---
-def apply_kor_emoji_map(data_series, kor_map, emoji_map):
-    return data_series.map(
-        lambda x: f"{emoji_map.get(x, '')} {kor_map.get(x, x)}" if pd.notna(x) else x
-    )
+st.divider()
 
+# 장르 분석 파트 생성 (장르 라벨/색상은 utils.taxonomy)
 # --- 파이(도넛) 차트 함수 ---
-def plot_genre_pie(data, title, kor_map, emoji_map, color_map):
-    mapped = apply_kor_emoji_map(data, kor_map, emoji_map)
+def build_genre_pie(data, title, taxonomy):
+    mapped = taxonomy.labels(data)
     counts = mapped.value_counts().reset_index()
     counts.columns = ['category', 'count']
     total = counts['count'].sum()
@@ -413,7 +386,7 @@ def plot_genre_pie(data, title, kor_map, emoji_map, color_map):
         color='category',
         title=title,
         hole=0.4,
-        color_discrete_map=color_map
+        color_discrete_map=taxonomy.color_map()
     )
     fig.update_layout(
         width=650,
@@ -439,6 +412,13 @@ def plot_genre_pie(data, title, kor_map, emoji_map, color_map):
         insidetextorientation='horizontal',
         textfont_size=30
     )
+    return fig
+
+def plot_genre_pie(file_name, data, title, taxonomy):
+    fig = cached_figure(
+        file_name, "primary_genre", "pie", st.session_state.theme,
+        lambda: build_genre_pie(data, title, taxonomy)
+    )
     st.plotly_chart(fig, use_container_width=True)
 
 # --- 사용 예시 ---
@@ -446,27 +426,24 @@ col_gen, col_nyt, col_imdb = st.columns([1, 1, 1], gap="large")
 with col_gen:
     st.subheader("흥행예측도서 장르 분포")
     plot_genre_pie(
+        RANKED_FILE,
         df_ranked['primary_genre'],
         title=" ",
-        kor_map=genre_kor_map,
-        emoji_map=genre_emoji_map,
-        color_map=genre_color_map
+        taxonomy=GENRE
     )
 with col_nyt:
     st.subheader("미국 인기 도서 장르 분포")
     plot_genre_pie(
+        'nyt_bestseller_with_keyword.csv',
         df_nyb['primary_genre'],
         title=" ",
-        kor_map=genre_kor_map,
-        emoji_map=genre_emoji_map,
-        color_map=genre_color_map
+        taxonomy=GENRE
     )
 with col_imdb:
     st.subheader("K-Contents 장르 분포")
     plot_genre_pie(
+        "imdb_llm_filtered_final.csv",
         df_imdb['primary_genre'],
         title=" ",
-        kor_map=genre_kor_map_imdb,
-        emoji_map=genre_emoji_map,
-        color_map=genre_color_map_imdb
+        taxonomy=GENRE_SHORT
     )
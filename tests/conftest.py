@@ -0,0 +1,74 @@
+"""
+테스트 공용 fixture: Google Drive/표지 호스트 대신 쓰는 로컬 HTTP 서버.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+
+class LocalServer:
+    """
+    경로별 응답을 등록해 두는 localhost HTTP 서버.
+    routes[path] = (상태 코드, 본문, Content-Type), 없는 경로는 404.
+    hold(path)로 막아 둔 경로는 release(path)를 부를 때까지 응답하지 않음.
+    요청받은 경로는 도착 순서대로 requests에 남음.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.requests = []
+        self._held = {}
+        self._lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with server._lock:
+                    server.requests.append(self.path)
+                    held = server._held.get(self.path)
+                if held is not None:
+                    held.wait(timeout=30)
+                status, body, content_type = server.routes.get(self.path, (404, b"not found", "text/plain"))
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def add(self, path, body, status=200, content_type="application/octet-stream"):
+        self.routes[path] = (status, body, content_type)
+        return self.url(path)
+
+    def hold(self, path):
+        self._held[path] = threading.Event()
+
+    def release(self, path):
+        self._held[path].set()
+
+    def count(self, path):
+        with self._lock:
+            return self.requests.count(path)
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    server.thread.start()
+    try:
+        yield server
+    finally:
+        for event in server._held.values():
+            event.set()
+        server.httpd.shutdown()
+        server.httpd.server_close()
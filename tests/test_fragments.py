@@ -0,0 +1,154 @@
+"""
+순위/필터 위젯이 fragment 안에 그려지는지 확인 (AppTest).
+
+fragment 안의 위젯을 바꾸면 Streamlit은 그 fragment만 다시 실행하므로, 위젯이 어느
+fragment(또는 페이지 본문)에서 만들어지는지를 봄. 공개 API인 st.fragment,
+st.set_page_config(페이지 본문마다 한 번 호출)와 위젯 함수만 감싸서 기록하고,
+위젯은 key로 찾음.
+
+AppTest는 위젯을 바꾸면 항상 스크립트 전체를 다시 실행하므로 재실행 범위 자체는
+여기서 재지 않음.
+
+data/ 에 데이터셋이 없으면 (다운로드 전) 건너뜀.
+
+    python -m pytest tests
+"""
+import functools
+import os
+from collections import Counter
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from utils.data_loader import DATA_DIR, GOOGLE_DRIVE_LINKS
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE_BODY = "page"
+TIMEOUT = 180
+WIDGETS = ["selectbox", "radio", "pills", "select_slider", "slider", "number_input"]
+
+pytestmark = pytest.mark.skipif(
+    not all(os.path.exists(os.path.join(ROOT, DATA_DIR, name)) for name in GOOGLE_DRIVE_LINKS),
+    reason="data/ 데이터셋이 없음",
+)
+
+# 페이지 -> {위젯 key: (위젯 종류, 위젯이 있어야 하는 fragment)}
+PAGE_WIDGETS = {
+    "pages/1_translation.py": {
+        "ranking_sort_by": ("selectbox", "ranking_section"),
+        "ranking_order": ("radio", "ranking_section"),
+        "ranking_genre_filter": ("pills", "ranking_section"),
+        "topsis_weight_salespoint": ("select_slider", "ranking_section"),
+    },
+    "pages/2_us_market.py": {
+        "main_persona_filter_analysis": ("pills", "persona_analysis_section"),
+        "pairing_persona_filter_pairing": ("pills", "persona_pairing_section"),
+        "pairing_count": ("number_input", "persona_pairing_section"),
+        "nyt_feature_filter": ("radio", "feature_analysis_section"),
+    },
+    "pages/3_domestic_market.py": {
+        "domestic_genre_filter": ("pills", "domestic_trend_section"),
+        "domestic_year_filter": ("slider", "domestic_trend_section"),
+        "publisher_select": ("selectbox", "publisher_section"),
+    },
+}
+
+
+class WidgetScopes:
+    """페이지 본문/fragment별 실행 횟수와 key가 있는 위젯이 그려진 fragment."""
+
+    def __init__(self, monkeypatch):
+        self.counts = Counter()
+        self.scopes = {}
+        self._running = []
+        monkeypatch.setattr(st, "fragment", self._fragment(st.fragment))
+        monkeypatch.setattr(st, "set_page_config", self._page_config(st.set_page_config))
+        for name in WIDGETS:
+            monkeypatch.setattr(st, name, self._widget(getattr(st, name)))
+
+    def _fragment(self, fragment):
+        def recording_fragment(func=None, **kwargs):
+            if func is None:
+                return lambda f: recording_fragment(f, **kwargs)
+
+            @functools.wraps(func)
+            def recorded(*args, **inner_kwargs):
+                self.counts[func.__name__] += 1
+                self._running.append(func.__name__)
+                try:
+                    return func(*args, **inner_kwargs)
+                finally:
+                    self._running.pop()
+
+            return fragment(recorded, **kwargs)
+        return recording_fragment
+
+    def _page_config(self, set_page_config):
+        def counted(*args, **kwargs):
+            self.counts[PAGE_BODY] += 1
+            return set_page_config(*args, **kwargs)
+        return counted
+
+    def _widget(self, widget):
+        @functools.wraps(widget)
+        def recorded(*args, **kwargs):
+            if kwargs.get("key") is not None:
+                self.scopes[kwargs["key"]] = self._running[-1] if self._running else PAGE_BODY
+            return widget(*args, **kwargs)
+        return recorded
+
+
+@pytest.fixture
+def scopes(monkeypatch):
+    monkeypatch.chdir(ROOT)
+    return WidgetScopes(monkeypatch)
+
+
+def widget(at, kind, key):
+    """key로 위젯을 찾음 (AppTest에 pills 조회 함수가 없어 button_group에서 찾음)."""
+    if kind == "pills":
+        return next(w for w in at.get("button_group") if w.key == key)
+    return getattr(at, kind)(key=key)
+
+
+def open_page(page):
+    at = AppTest.from_file("Home.py", default_timeout=TIMEOUT)
+    at.switch_page(page).run()
+    assert not at.exception
+    return at
+
+
+@pytest.mark.parametrize("page", list(PAGE_WIDGETS), ids=[page.split("/")[-1] for page in PAGE_WIDGETS])
+def test_filter_widgets_are_inside_their_fragment(scopes, page):
+    at = open_page(page)
+    widgets = PAGE_WIDGETS[page]
+
+    assert scopes.counts[PAGE_BODY] == 1
+    for fragment in {fragment for _, fragment in widgets.values()}:
+        assert scopes.counts[fragment] == 1
+    for key, (kind, fragment) in widgets.items():
+        assert widget(at, kind, key).key == key
+        assert scopes.scopes.get(key) == fragment, key
+
+
+# AppTest는 pills/segmented_control 값이 있으면 다시 실행하지 못하므로
+# (단일 선택 값을 목록처럼 순회함) 그런 위젯이 없는 페이지 1의 위젯만 바꿔 봄
+CHANGES = [
+    ("pages/1_translation.py", "ranking_sort_by", lambda at: at.selectbox(key="ranking_sort_by").set_value("salespoint")),
+    ("pages/1_translation.py", "ranking_order", lambda at: at.radio(key="ranking_order").set_value("내림차순")),
+]
+
+
+@pytest.mark.parametrize("page, key, change", CHANGES, ids=[key for _, key, _ in CHANGES])
+def test_changed_widget_keeps_its_fragment(scopes, page, key, change):
+    at = open_page(page)
+    changed = change(at)
+    expected = changed.value
+
+    changed.run()
+
+    assert not at.exception
+    kind, fragment = PAGE_WIDGETS[page][key]
+    assert scopes.scopes[key] == fragment
+    assert widget(at, kind, key).value == expected
@@ -0,0 +1,83 @@
+"""
+utils.image_cache.CoverCache를 로컬 HTTP 서버(표지 호스트 대신)와 임시 폴더로 확인.
+
+    python -m pytest tests
+"""
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from utils import image_cache
+from utils.image_cache import PLACEHOLDER, THUMB_SIZE, CoverCache
+
+
+def png_bytes(size=(640, 960)):
+    out = io.BytesIO()
+    Image.new("RGB", size, (200, 30, 30)).save(out, "PNG")
+    return out.getvalue()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = CoverCache(str(tmp_path / "covers"), static_url="app/static/covers", max_workers=2)
+    yield cache
+    cache._pool.shutdown(wait=True)
+
+
+def test_cover_is_stored_as_webp_thumbnail(http_server, cache):
+    url = http_server.add("/cover.png", png_bytes(), content_type="image/png")
+
+    assert cache.prefetch([url], timeout=None) == 1
+
+    path = cache.path(url)
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data[:4] == b"RIFF" and data[8:12] == b"WEBP"
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == "WEBP"
+        assert image.size == THUMB_SIZE
+    assert cache.src(url) == f"app/static/covers/{os.path.basename(path)}"
+    assert [name for name in os.listdir(cache.directory) if name.endswith(".tmp")] == []
+
+
+def test_cached_cover_is_not_fetched_again(http_server, cache, tmp_path):
+    url = http_server.add("/cover.png", png_bytes(), content_type="image/png")
+    cache.prefetch([url], timeout=None)
+
+    assert cache.prefetch([url], timeout=None) == 0
+    assert cache.src(url).startswith("app/static/covers/")
+    # 새 프로세스(새 CoverCache)도 디스크의 썸네일을 그대로 씀
+    other = CoverCache(cache.directory, max_workers=1)
+    assert other.submit(url) is None
+    other._pool.shutdown(wait=True)
+
+    assert http_server.count("/cover.png") == 1
+
+
+@pytest.mark.parametrize("path, status, body, content_type", [
+    ("/missing.png", 404, b"not found", "text/plain"),
+    ("/page.png", 200, b"<html>not an image</html>", "text/html"),
+])
+def test_failed_cover_falls_back_to_placeholder(http_server, cache, monkeypatch, path, status, body, content_type):
+    url = http_server.add(path, body, status=status, content_type=content_type)
+
+    cache.prefetch([url], timeout=None)
+
+    assert not os.path.exists(cache.path(url))
+    assert cache.src(url) == PLACEHOLDER
+    # 실패한 표지는 캐시하지 않고, 재시도 간격 안에서는 다시 요청하지도 않음
+    cache.prefetch([url], timeout=None)
+    assert http_server.count(path) == 1
+    assert not os.path.exists(cache.directory) or os.listdir(cache.directory) == []
+
+    # 재시도 간격이 지나면 다시 받아 봄
+    monkeypatch.setattr(image_cache, "RETRY_AFTER", 0)
+    cache.prefetch([url], timeout=None)
+    assert http_server.count(path) == 2
+
+
+def test_missing_url_uses_placeholder(cache):
+    assert cache.src(None) == PLACEHOLDER
+    assert cache.src("not-a-url") == PLACEHOLDER
@@ -0,0 +1,83 @@
+"""
+utils.prefetch 워밍업을 로컬 HTTP 서버(Google Drive 대신)로 확인.
+
+    python -m pytest tests
+"""
+import os
+import time
+
+import pandas as pd
+
+from utils.data_loader import DATA_DIR, file_checksum, read_dataset, read_manifest
+from utils.prefetch import prefetch_all, start_background_prefetch
+
+FILES = {
+    "a.csv": b"x,y\n1,2\n",
+    "b.csv": b"x,y\n3,4\n5,6\n",
+    "c.csv": b"x\n7\n",
+}
+
+
+def serve(http_server, files):
+    return {name: http_server.add(f"/{name}", body) for name, body in files.items()}
+
+
+def test_prefetch_requests_files_in_order(http_server, tmp_path):
+    links = serve(http_server, FILES)
+
+    results = prefetch_all(links, data_dir=str(tmp_path), max_workers=1)
+
+    assert http_server.requests == [f"/{name}" for name in FILES]
+    assert list(results) == list(FILES)
+    assert set(results.values()) == {"ok"}
+    manifest = read_manifest(str(tmp_path))
+    for name, body in FILES.items():
+        path = tmp_path / name
+        assert path.read_bytes() == body
+        assert manifest[name]["sha256"] == file_checksum(str(path))
+        assert not os.path.exists(f"{path}.part")
+
+
+def test_prefetch_skips_files_already_present(http_server, tmp_path):
+    links = serve(http_server, FILES)
+    (tmp_path / "b.csv").write_bytes(b"local\n")
+
+    results = prefetch_all(links, data_dir=str(tmp_path), max_workers=2)
+
+    assert set(results.values()) == {"ok"}
+    assert http_server.count("/b.csv") == 0
+    assert (tmp_path / "b.csv").read_bytes() == b"local\n"
+    # 있던 파일도 manifest에 현재 상태로 기록
+    assert read_manifest(str(tmp_path))["b.csv"]["sha256"] == file_checksum(str(tmp_path / "b.csv"))
+
+    prefetch_all(links, data_dir=str(tmp_path), max_workers=2)
+    assert all(http_server.count(f"/{name}") == 1 for name in ("a.csv", "c.csv"))
+
+
+def test_failed_prefetch_does_not_block_page_load(http_server, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(DATA_DIR)
+    pd.DataFrame({"x": [1, 2]}).to_csv(os.path.join(DATA_DIR, "present.csv"), index=False)
+    links = {
+        "slow.csv": http_server.add("/slow.csv", b"x\n1\n"),
+        "missing.csv": http_server.url("/missing.csv"),
+    }
+    http_server.hold("/slow.csv")
+
+    start = time.perf_counter()
+    future = start_background_prefetch(max_workers=2, links=links)
+    start_background_prefetch.clear()
+    assert time.perf_counter() - start < 1
+
+    # 워밍업이 끝나지 않았고 한 파일은 실패해도 이미 있는 데이터셋은 바로 읽힘
+    deadline = time.perf_counter() + 10
+    while http_server.count("/missing.csv") == 0 and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    assert not future.done()
+    assert read_dataset("present.csv")["x"].tolist() == [1, 2]
+
+    http_server.release("/slow.csv")
+    results = future.result(timeout=10)
+    assert results["slow.csv"] == "ok"
+    assert results["missing.csv"].startswith("error:") and "404" in results["missing.csv"]
+    assert not os.path.exists(os.path.join(DATA_DIR, "missing.csv"))
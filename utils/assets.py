@@ -0,0 +1,151 @@
+"""
+번들 이미지(images/*.png)의 화면 크기별 WebP 변형.
+
+원본마다 표시 너비(와 고해상도 화면용 2배 너비)로 줄인 WebP를 내용 해시가 들어간
+이름으로 static/assets에 만들고, manifest.json에 원본 해시와 변형 목록을 기록함.
+페이지는 srcset으로 화면에 맞는 변형만 받고, ?v=<해시> 주소라 브라우저가 오래 캐시함.
+원본이 바뀌면 해시가 달라져 새 이름으로 다시 만들어짐.
+
+    python -m utils.assets   # 배포 전에 변형을 미리 만들어 둠 (없으면 첫 요청 때 만듦)
+"""
+import argparse
+import hashlib
+import json
+import os
+import time
+import streamlit as st
+from PIL import Image
+from utils.image_cache import STATIC_DIR
+
+ASSET_DIR = os.path.join(STATIC_DIR, "assets")
+ASSET_URL = "app/static/assets"
+MANIFEST_PATH = os.path.join(ASSET_DIR, "manifest.json")
+WEBP_QUALITY = 82
+
+# 원본 -> 만들 너비 (화면 표시 너비와 그 2배)
+ASSET_SOURCES = {
+    "images/bookshelf.png": (450, 900, 1800),
+    **{f"images/cluster_{i}.png": (225, 450) for i in range(5)},
+}
+
+
+def source_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+
+def variant_name(source, width, digest):
+    stem = os.path.splitext(os.path.basename(source))[0]
+    return f"{stem}-{width}w-{digest}.webp"
+
+
+def build_variants(source, widths, asset_dir=ASSET_DIR, quality=WEBP_QUALITY):
+    """원본 하나의 변형들을 만들고 manifest 항목을 반환. 이미 있는 파일은 다시 만들지 않음."""
+    digest = source_hash(source)
+    with Image.open(source) as image:
+        image.load()
+        original_width, original_height = image.size
+        # 원본보다 큰 변형은 만들지 않고 원본 너비로 대신함
+        targets = sorted({min(width, original_width) for width in widths})
+        variants = {}
+        for width in targets:
+            name = variant_name(source, width, digest)
+            path = os.path.join(asset_dir, name)
+            if not os.path.exists(path):
+                height = round(original_height * width / original_width)
+                resized = image.resize((width, height), Image.LANCZOS, reducing_gap=3.0) if width != original_width else image
+                tmp_path = f"{path}.tmp"
+                resized.save(tmp_path, "WEBP", quality=quality, method=4)
+                os.replace(tmp_path, path)
+            variants[str(width)] = name
+    return {"hash": digest, "width": original_width, "height": original_height, "variants": variants}
+
+
+def read_asset_manifest(path=MANIFEST_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def build_assets(sources=None, asset_dir=ASSET_DIR, prune=True):
+    """
+    바뀐 원본의 변형만 새로 만들고 manifest를 갱신. 전체 manifest를 반환.
+    prune=True면 manifest에 없는 이전 해시의 변형 파일을 지움.
+    """
+    sources = ASSET_SOURCES if sources is None else sources
+    os.makedirs(asset_dir, exist_ok=True)
+    manifest_path = os.path.join(asset_dir, "manifest.json")
+    manifest = read_asset_manifest(manifest_path)
+    for source, widths in sources.items():
+        if not os.path.exists(source):
+            manifest.pop(source, None)
+            continue
+        entry = manifest.get(source)
+        files_present = entry and all(os.path.exists(os.path.join(asset_dir, n)) for n in entry["variants"].values())
+        if not files_present or entry["hash"] != source_hash(source):
+            manifest[source] = build_variants(source, widths, asset_dir)
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, manifest_path)
+    if prune:
+        keep = {name for entry in manifest.values() for name in entry["variants"].values()} | {"manifest.json"}
+        for name in os.listdir(asset_dir):
+            if name not in keep and name.endswith(".webp"):
+                os.remove(os.path.join(asset_dir, name))
+    return manifest
+
+
+@st.cache_resource(show_spinner=False)
+def get_asset_manifest():
+    """프로세스 단위로 한 번만 확인하는 변형 manifest. 만들 수 없으면 빈 dict."""
+    try:
+        return build_assets()
+    except OSError:
+        return read_asset_manifest()
+
+
+def responsive_image(source, width=None, alt=""):
+    """
+    원본 대신 화면 크기에 맞는 WebP 변형을 srcset으로 그림.
+    width를 주면 그 너비로, 없으면 컨테이너 너비에 맞춤. 변형이 없으면 st.image로 원본을 그림.
+    """
+    entry = get_asset_manifest().get(source)
+    if not entry:
+        if os.path.exists(source):
+            st.image(source, width=width, use_container_width=width is None)
+        return
+    srcset = ", ".join(
+        f"{ASSET_URL}/{name}?v={entry['hash']} {w}w" for w, name in sorted(entry["variants"].items(), key=lambda x: int(x[0]))
+    )
+    smallest = min(entry["variants"], key=int)
+    fallback = f"{ASSET_URL}/{entry['variants'][smallest]}?v={entry['hash']}"
+    sizes = f"{width}px" if width else "100vw"
+    style = f"width:{width}px;max-width:100%;" if width else "width:100%;"
+    st.markdown(
+        f'<img src="{fallback}" srcset="{srcset}" sizes="{sizes}" alt="{alt}" '
+        f'width="{entry["width"]}" height="{entry["height"]}" '
+        f'style="{style}height:auto;display:block;" decoding="async">',
+        unsafe_allow_html=True,
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="번들 이미지의 WebP 변형을 만듦")
+    parser.parse_args(argv)
+    start = time.perf_counter()
+    manifest = build_assets()
+    for source, entry in manifest.items():
+        original = os.path.getsize(source)
+        sizes = ", ".join(
+            f"{w}w {os.path.getsize(os.path.join(ASSET_DIR, name)) / 1024:,.0f} KB" for w, name in entry["variants"].items()
+        )
+        print(f"{source} ({original / 1024:,.0f} KB): {sizes}")
+    print(f"{len(manifest)} images in {time.perf_counter() - start:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""
+NYT 베스트셀러 속성 컬럼(plot_elements 등)의 전처리.
+
+"{'survival': 0.8, 'revenge': 0.3}" 형태의 문자열을 행마다 한 번만 파싱해
+(book, category, attribute, weight) 형태의 긴 테이블로 만들고,
+원본 CSV 체크섬을 키로 Parquet에 저장해 두고 재사용함.
+"""
+import json
+import os
+import pandas as pd
+import streamlit as st
+from utils.data_loader import CACHE_DIR, recorded_checksum
+from utils.registry import get_dataset
+
+NYT_FILE = "nyt_bestseller_with_keyword.csv"
+
+# 분석 카테고리 -> (원본 JSON 컬럼, 대표 속성 컬럼)
+ATTRIBUTE_COLUMNS = {
+    "plot": ("plot_elements", "primary_plot"),
+    "character": ("character_types", "primary_character"),
+    "theme": ("theme_categories", "primary_theme"),
+    "setting": ("setting_categories", "primary_setting"),
+    "tone": ("tone_categories", "primary_tone"),
+}
+
+
+def parse_attribute_dict(value):
+    """속성 문자열을 {속성: 가중치} dict로 변환. 파싱할 수 없으면 None."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = json.loads(value.replace("'", '"'))
+        return {key: float(weight) for key, weight in parsed.items()}
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def build_attribute_table(df, columns=ATTRIBUTE_COLUMNS):
+    """
+    속성 컬럼들을 (book, category, attribute, weight) 긴 테이블로 펼침.
+    book은 원본 DataFrame의 행 위치.
+    """
+    books, categories, attributes, weights = [], [], [], []
+    for category, (source_col, _) in columns.items():
+        if source_col not in df.columns:
+            continue
+        for book, value in enumerate(df[source_col].tolist()):
+            parsed = parse_attribute_dict(value)
+            if not parsed:
+                continue
+            books.extend([book] * len(parsed))
+            categories.extend([category] * len(parsed))
+            attributes.extend(parsed.keys())
+            weights.extend(parsed.values())
+    return pd.DataFrame({
+        "book": pd.array(books, dtype="int32"),
+        "category": pd.Categorical(categories, categories=list(columns)),
+        "attribute": pd.Categorical(attributes),
+        "weight": pd.array(weights, dtype="float32"),
+    })
+
+
+def primary_attributes(table, n_books, columns=ATTRIBUTE_COLUMNS):
+    """
+    카테고리별로 가중치가 가장 큰 속성을 골라 book 순서의 DataFrame으로 반환.
+    컬럼명은 primary_plot, primary_tone 등. 동점이면 먼저 나온 속성을 선택.
+    """
+    result = pd.DataFrame(index=pd.RangeIndex(n_books))
+    if not table.empty:
+        winners = table.loc[table.groupby(["category", "book"], observed=True)["weight"].idxmax()]
+        wide = winners.pivot(index="book", columns="category", values="attribute")
+    else:
+        wide = pd.DataFrame()
+    for category, (_, primary_col) in columns.items():
+        if category in wide.columns:
+            result[primary_col] = wide[category].astype(object).reindex(result.index)
+        else:
+            result[primary_col] = None
+    return result
+
+
+def attribute_weights(table, category):
+    """카테고리 하나의 book x attribute 가중치 행렬 (없는 조합은 0)."""
+    subset = table[table["category"] == category]
+    return subset.pivot_table(index="book", columns="attribute", values="weight",
+                              aggfunc="first", fill_value=0, observed=True)
+
+
+def attribute_table_path(file_name, checksum):
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(CACHE_DIR, f"{stem}-attributes-{checksum[:16]}.parquet")
+
+
+@st.cache_resource(show_spinner=False)
+def get_attribute_table(file_name=NYT_FILE):
+    """
+    속성 테이블을 프로세스 단위로 공유.
+    원본이 바뀌지 않았다면 이전에 저장한 Parquet을 그대로 읽음.
+    """
+    df = get_dataset(file_name)
+    if df.empty:
+        return build_attribute_table(df)
+    path = attribute_table_path(file_name, recorded_checksum(file_name))
+    if os.path.exists(path):
+        return pd.read_parquet(path)
+    table = build_attribute_table(df)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        table.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        pass
+    return table
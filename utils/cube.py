@@ -0,0 +1,250 @@
+"""
+한국 도서시장 페이지용 집계 큐브.
+
+한국도서 / 번역도서를 (저자, 출판사, 연도, 장르, 흥행 여부) 조합 단위로 한 번만 묶어
+도서 수와 판매지수 합계를 가진 작은 표로 만들어 둠. 작가 순위, 연도별 흥행 추이 같은
+집계와 연도/장르 필터는 원본 전체가 아니라 이 표에서 다시 묶기만 함.
+상위 N권 목록은 정렬 순열을 미리 만들어 두고, 필터는 순열에 마스크만 씌움.
+출판사별 지표(PublisherStats)도 큐브에서 한 번 만들어 출판사를 인덱스로 둠.
+
+    python -m utils.cube   # 원본 groupby와 큐브 재집계 비교
+"""
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.kpi import BOOK_KOREAN_FILE, RANKED_FILE, TRANS_FILE
+from utils.ranking import sort_permutation
+from utils.registry import get_dataset
+
+# 큐브 차원 이름 -> 데이터셋별 원본 컬럼
+KOREAN_DIMENSIONS = {"author": "저자", "publisher": "출판사", "year": "발행년도", "genre": "primary_genre", "success": "success"}
+TRANS_DIMENSIONS = {"author": "Author", "publisher": "출판사", "year": "Published Year", "genre": "primary_genre", "success": "success"}
+SUM_COLUMNS = ["salespoint"]
+
+
+def _condition_mask(values, condition):
+    """
+    조건 하나의 마스크. condition이 (하한, 상한) 튜플이면 범위(양 끝 포함),
+    그 밖의 목록이면 포함 여부.
+    """
+    if isinstance(condition, tuple):
+        low, high = condition
+        return ((values >= low) & (values <= high)).to_numpy(dtype=bool, na_value=False)
+    return values.isin(list(condition)).to_numpy()
+
+
+def _where_mask(frame, where, size):
+    mask = np.ones(size, dtype=bool)
+    for dim, condition in (where or {}).items():
+        if condition is None:
+            continue
+        if dim not in frame.columns:
+            # 없는 차원으로 거르면 남는 행이 없음
+            return np.zeros(size, dtype=bool)
+        mask &= _condition_mask(frame[dim], condition)
+    return mask
+
+
+class Cube:
+    """
+    데이터셋 하나의 차원 조합별 도서 수(count)와 합계(SUM_COLUMNS) 표.
+    where는 {차원: 값 목록 또는 (하한, 상한)}이고, None인 조건은 무시함.
+    """
+
+    def __init__(self, df, dimensions, sums=SUM_COLUMNS):
+        present = {dim: col for dim, col in dimensions.items() if col in df.columns}
+        self.dimensions = list(present)
+        self.sums = [c for c in sums if c in df.columns]
+        frame = df[list(present.values()) + self.sums].rename(columns={col: dim for dim, col in present.items()})
+        frame = frame.assign(count=1)
+        if self.dimensions:
+            # 결측 차원도 한 칸으로 남겨 다른 차원 기준 합계에서 빠지지 않게 함
+            grouped = frame.groupby(self.dimensions, observed=True, dropna=False, sort=False)
+            self.table = grouped[["count"] + self.sums].sum().reset_index()
+        else:
+            self.table = frame[["count"] + self.sums].sum().to_frame().T
+        self.rows = len(df)
+
+    def values(self, dim):
+        """차원의 값 목록 (정렬, 결측 제외)."""
+        if dim not in self.table.columns:
+            return []
+        return sorted(self.table[dim].dropna().unique().tolist())
+
+    def slice(self, where=None):
+        """조건에 맞는 큐브 칸들."""
+        return self.table[_where_mask(self.table, where, len(self.table))]
+
+    def rollup(self, by, measure="count", where=None):
+        """
+        by 차원 기준 measure 합계 (by 값 순으로 정렬, 결측 by는 제외).
+        원본의 groupby(by)[measure].sum()과 같은 값.
+        """
+        if by not in self.table.columns or measure not in self.table.columns:
+            return pd.Series(dtype="int64", name=measure)
+        return self.slice(where).groupby(by, observed=True)[measure].sum()
+
+
+class TopRows:
+    """정렬 기준 하나로 미리 정렬해 둔 행 순서. 상위 N권은 순서에 필터 마스크만 씌워 찾음."""
+
+    def __init__(self, df, column, ascending, dimensions):
+        self.df = df
+        self.order = (
+            sort_permutation(df[column], ascending) if column in df.columns else np.arange(len(df), dtype=np.int32)
+        )
+        self.columns = pd.DataFrame({dim: df[col] for dim, col in dimensions.items() if col in df.columns})
+
+    def top(self, n, where=None):
+        """조건에 맞는 상위 n행 (원래 인덱스 유지)."""
+        mask = _where_mask(self.columns, where, len(self.df))
+        order = self.order if mask.all() else self.order[mask[self.order]]
+        return self.df.iloc[order[:n]]
+
+
+class DomesticCube:
+    """한국도서/번역도서 큐브와 상위 목록 묶음."""
+
+    def __init__(self, df_book_korean, df_trans, df_ranked):
+        if {"ISBN"} <= set(df_book_korean.columns) and "ISBN" in df_ranked.columns:
+            # 한국도서의 흥행 여부 = 흥행예측도서 포함 여부
+            hit = df_book_korean["ISBN"].isin(df_ranked["ISBN"].unique()).astype("int8")
+            df_book_korean = df_book_korean.assign(success=hit)
+        self.korean = Cube(df_book_korean, KOREAN_DIMENSIONS)
+        self.translated = Cube(df_trans, TRANS_DIMENSIONS)
+        self.top_sales = TopRows(df_book_korean, "salespoint", False, KOREAN_DIMENSIONS)
+        self.top_bsr = TopRows(df_trans, "avg_bsr", True, TRANS_DIMENSIONS)
+
+    def years(self):
+        return sorted(set(self.korean.values("year")) | set(self.translated.values("year")))
+
+    def genres(self):
+        return sorted(set(self.korean.values("genre")) | set(self.translated.values("genre")))
+
+
+@st.cache_resource(show_spinner=False)
+def get_domestic_cube():
+    """한국 도서시장 집계 큐브 (프로세스 단위 공유)."""
+    return DomesticCube(get_dataset(BOOK_KOREAN_FILE), get_dataset(TRANS_FILE), get_dataset(RANKED_FILE))
+
+
+def _by_publisher(series):
+    # 데이터셋마다 category 범주가 달라 출판사 인덱스를 일반 값으로 맞춤
+    return series.set_axis(series.index.astype(object))
+
+
+class PublisherStats:
+    """
+    출판사별 지표 표(summary)와 장르 구성표(genre_mix). 둘 다 출판사가 인덱스라
+    출판사를 바꿀 때는 행 하나를 조회만 함.
+
+    - books / hits: 한국도서 수 / 그중 흥행예측도서 수, hit_ratio = hits / books (%)
+    - translated: 번역도서 수, translation_rate = translated / (translated + books) (%)
+      (핵심 지표의 번역 비율과 같은 정의)
+    - score_mean: 흥행예측도서의 평균 fuzzy_topsis_score
+    - genre_mix: 한국도서 + 번역도서의 장르별 도서 수
+    """
+
+    def __init__(self, cube, df_ranked):
+        summary = pd.DataFrame({
+            "books": _by_publisher(cube.korean.rollup("publisher")),
+            "hits": _by_publisher(cube.korean.rollup("publisher", where={"success": [1]})),
+            "translated": _by_publisher(cube.translated.rollup("publisher")),
+        }).fillna(0).astype("int64")
+        books = summary["books"].where(summary["books"] > 0)
+        summary["hit_ratio"] = summary["hits"] / books * 100
+        catalog = (summary["translated"] + summary["books"]).where(lambda x: x > 0)
+        summary["translation_rate"] = summary["translated"] / catalog * 100
+        if {"출판사", "fuzzy_topsis_score"} <= set(df_ranked.columns):
+            scores = df_ranked.groupby("출판사", observed=True)["fuzzy_topsis_score"].mean()
+            summary["score_mean"] = _by_publisher(scores).reindex(summary.index).astype("float64")
+        else:
+            summary["score_mean"] = np.nan
+        # 도서가 많은 출판사부터
+        self.summary = summary.sort_values(["books", "translated"], ascending=False, kind="stable")
+
+        cells = [c.slice() for c in (cube.korean, cube.translated) if {"publisher", "genre"} <= set(c.table.columns)]
+        if cells:
+            mix = pd.concat([c[["publisher", "genre", "count"]].astype({"publisher": object, "genre": object})
+                             for c in cells])
+            self.genre_mix = mix.groupby(["publisher", "genre"])["count"].sum().unstack(fill_value=0)
+        else:
+            self.genre_mix = pd.DataFrame()
+
+    def publishers(self):
+        return self.summary.index.tolist()
+
+    def get(self, publisher):
+        """출판사 지표 dict (값이 없으면 None)."""
+        # 컬럼별 dtype(정수/실수)을 유지하도록 칸 단위로 조회
+        values = {c: self.summary.at[publisher, c] for c in self.summary.columns}
+        return {k: None if pd.isna(v) else v.item() for k, v in values.items()}
+
+    def genres(self, publisher):
+        """출판사의 장르별 도서 수 (많은 순, 0 제외)."""
+        if publisher not in self.genre_mix.index:
+            return pd.Series(dtype="int64")
+        counts = self.genre_mix.loc[publisher]
+        return counts[counts > 0].sort_values(ascending=False, kind="stable")
+
+
+@st.cache_resource(show_spinner=False)
+def get_publisher_stats():
+    """출판사별 지표 (프로세스 단위 공유)."""
+    return PublisherStats(get_domestic_cube(), get_dataset(RANKED_FILE))
+
+
+def filter_conditions(genres=None, years=None, year_bounds=None):
+    """페이지 필터 값 -> where. 전체 연도 범위를 고르면 연도 조건을 두지 않음 (연도 없는 도서 포함)."""
+    where = {}
+    if genres:
+        where["genre"] = list(genres)
+    if years is not None and tuple(years) != tuple(year_bounds or ()):
+        where["year"] = tuple(years)
+    return where
+
+
+def benchmark(n_rows=500_000, repeat=5):
+    df = get_dataset(BOOK_KOREAN_FILE)
+    big = pd.concat([df] * max(1, n_rows // max(len(df), 1)), ignore_index=True)
+    start = time.perf_counter()
+    cube = Cube(big, KOREAN_DIMENSIONS)
+    print(f"cube build: {len(big):,} rows -> {len(cube.table):,} cells in {time.perf_counter() - start:.2f}s")
+    genres = cube.values("genre")[:3]
+    years = cube.values("year")
+    year_range = (years[len(years) // 4], years[-1]) if years else None
+    for label, where in (("all", {}), ("genre+year", {"genre": genres, "year": year_range})):
+        before = after = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            filtered = big
+            if where:
+                filtered = big[big["primary_genre"].isin(genres) & big["발행년도"].between(*year_range)]
+            expected = filtered.groupby("저자")["salespoint"].sum()
+            before = min(before, time.perf_counter() - start)
+            start = time.perf_counter()
+            result = cube.rollup("author", "salespoint", where)
+            after = min(after, time.perf_counter() - start)
+        assert np.array_equal(expected.to_numpy(), result.to_numpy())
+        print(f"{label:>12}: groupby {before * 1000:8.1f} ms  cube {after * 1000:8.1f} ms")
+
+    # 출판사 하나의 지표: 원본 스캔 vs 출판사 인덱스 조회
+    ranked = get_dataset(RANKED_FILE)
+    stats = PublisherStats(DomesticCube(big, get_dataset(TRANS_FILE), ranked), ranked)
+    hit_isbns = ranked["ISBN"].unique() if "ISBN" in ranked.columns else []
+    for publisher in stats.publishers()[:1]:
+        before = after = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            books = big[big["출판사"] == publisher]
+            _ = (len(books), books["ISBN"].isin(hit_isbns).sum(), books["primary_genre"].value_counts())
+            before = min(before, time.perf_counter() - start)
+            start = time.perf_counter()
+            _ = (stats.get(publisher), stats.genres(publisher))
+            after = min(after, time.perf_counter() - start)
+        print(f"{'publisher':>12}: scan {before * 1000:11.1f} ms  lookup {after * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
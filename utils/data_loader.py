@@ -1,8 +1,13 @@
-# utils/data_loader.py
 import pandas as pd
 import streamlit as st
-import gdown
+import requests
+import hashlib
+import json
 import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
 # Google Drive 파일 매핑 (파일명: 공유 링크)
 GOOGLE_DRIVE_LINKS = {
     "book_korean.csv": "https://drive.google.com/file/d/10WYtmbT_ZjtffvWCpKzmF-hO1Kkj0Qx0/view?usp=sharing",
@@ -13,25 +18,342 @@ GOOGLE_DRIVE_LINKS = {
     "trans_final_with_url.csv": "https://drive.google.com/file/d/1jcCTprvfQLgpbjv2946lueI-Pd1xafzp/view?usp=drive_link",
     "흥행예측도서_ranked.csv": "https://drive.google.com/file/d/101J67nfFOxgWMQb8M57BFQO6I1Pogjjf/view?usp=drive_link"
 }
-@st.cache_data
-def load_data(file_name):
+DATA_DIR = "data"
+# 컬럼형(Parquet) 캐시 폴더
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# 다운로드한 파일별 크기/해시/수신 시각/원본 URL 기록
+MANIFEST_FILE = "manifest.json"
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+DOWNLOAD_TIMEOUT = 60
+
+_download_locks = {}
+_locks_guard = threading.Lock()
+
+
+def file_checksum(file_path, chunk_size=1 << 20):
+    """파일 내용의 sha256 해시를 반환."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _file_lock(file_path):
+    with _locks_guard:
+        return _download_locks.setdefault(os.path.abspath(file_path), threading.Lock())
+
+
+def read_manifest(data_dir=DATA_DIR):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _update_manifest(file_name, entry, data_dir):
+    path = os.path.join(data_dir, MANIFEST_FILE)
+    with _file_lock(path):
+        manifest = read_manifest(data_dir)
+        manifest[file_name] = entry
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+
+def _manifest_entry(file_path, url, etag=None, last_modified=None):
+    stat = os.stat(file_path)
+    return {
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+        "sha256": file_checksum(file_path),
+        "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "url": url,
+        "etag": etag,
+        "last_modified": last_modified,
+    }
+
+
+def register_local_file(file_name, data_dir=DATA_DIR, source="local"):
+    """
+    data 폴더에 직접 만든 파일을 manifest에 기록.
+    기록하지 않으면 read_dataset이 크기 불일치로 보고 원격 파일로 덮어씀.
+    """
+    file_path = os.path.join(data_dir, file_name)
+    _update_manifest(file_name, _manifest_entry(file_path, source), data_dir)
+
+
+def verify_file(file_name, data_dir=DATA_DIR, deep=False):
+    """
+    data 폴더의 파일이 manifest 기록과 일치하는지 확인.
+    기본은 크기만 비교하고, deep=True면 sha256까지 비교함.
+    """
+    file_path = os.path.join(data_dir, file_name)
+    entry = read_manifest(data_dir).get(file_name)
+    if entry is None or not os.path.exists(file_path):
+        return False
+    if os.path.getsize(file_path) != entry["size"]:
+        return False
+    return not deep or file_checksum(file_path) == entry["sha256"]
+
+
+def recorded_checksum(file_name, data_dir=DATA_DIR):
     """
-    Google Drive에서 파일을 다운로드하여 DataFrame으로 반환.
-    파일이 이미 있으면 재다운로드하지 않음.
+    manifest에 기록된 sha256을 반환. 파일이 기록 이후 바뀌었으면 다시 계산함.
+    """
+    file_path = os.path.join(data_dir, file_name)
+    entry = read_manifest(data_dir).get(file_name)
+    if entry is not None:
+        stat = os.stat(file_path)
+        if stat.st_size == entry["size"] and stat.st_mtime == entry.get("mtime"):
+            return entry["sha256"]
+    return file_checksum(file_path)
+
+
+def direct_download_url(url):
+    """Google Drive 공유 링크를 직접 다운로드 URL로 변환. 그 외 URL은 그대로 반환."""
+    if "drive.google.com" not in url:
+        return url
+    match = re.search(r"/d/([\w-]+)", url) or re.search(r"[?&]id=([\w-]+)", url)
+    if match is None:
+        return url
+    return f"https://drive.usercontent.google.com/download?id={match.group(1)}&export=download&confirm=t"
+
+
+def _part_validator(response):
+    """If-Range에 쓸 응답의 버전 값. 강한 ETag가 없으면 Last-Modified."""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _read_part_validator(path):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("validator")
+    except (OSError, ValueError):
+        return None
+
+
+def _write_part_validator(path, validator):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"validator": validator}, f)
+
+
+def _discard_part(path):
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def download_file(file_name, url=None, data_dir=DATA_DIR, force=False, refresh=False, quiet=True):
+    """
+    파일을 .part 임시 파일로 내려받은 뒤 원자적으로 이름을 바꿔 저장하고 manifest를 갱신.
+
+    - 이전 다운로드가 끊겨 .part 파일이 남아 있으면 Range 요청으로 이어받음.
+      .part.json에 둔 원격 버전(ETag/Last-Modified)을 If-Range로 보내 원격 파일이
+      바뀌었으면 .part를 버리고 처음부터 받음
+    - refresh=True면 ETag/Last-Modified 조건부 요청으로 원격 파일이 바뀐 경우에만 다시 받음
+    - force=True면 무조건 다시 받음
+    저장된 경로를 반환.
+    """
+    url = url or GOOGLE_DRIVE_LINKS.get(file_name)
+    if url is None:
+        raise KeyError(f"Google Drive 링크가 등록되지 않은 파일명입니다: {file_name}")
+    os.makedirs(data_dir, exist_ok=True)
+    file_path = os.path.join(data_dir, file_name)
+    part_path = f"{file_path}.part"
+    # 같은 파일을 여러 스레드가 동시에 받지 않도록 파일 단위 잠금
+    with _file_lock(file_path):
+        entry = read_manifest(data_dir).get(file_name)
+        exists = os.path.exists(file_path)
+        if exists and entry is None:
+            # manifest 도입 이전에 받은 파일은 현재 상태를 기록해 둠
+            entry = _manifest_entry(file_path, url)
+            _update_manifest(file_name, entry, data_dir)
+        if exists and not force and not refresh:
+            return file_path
+
+        validator_path = f"{part_path}.json"
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        validator = _read_part_validator(validator_path) if offset else None
+        if offset and validator is None:
+            # 어느 버전을 받던 중인지 모르는 .part는 이어붙이지 않음
+            _discard_part(part_path)
+            offset = 0
+
+        for _ in range(2):
+            # 압축 전송이면 Range/Content-Length가 받은 바이트와 맞지 않으므로 원본 그대로 요청
+            headers = {"Accept-Encoding": "identity"}
+            if offset:
+                # 받던 버전과 같을 때만 나머지(206)를, 바뀌었으면 전체(200)를 받음
+                headers["Range"] = f"bytes={offset}-"
+                headers["If-Range"] = validator
+            elif exists and refresh and not force:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+            response = requests.get(direct_download_url(url), headers=headers, stream=True,
+                                    timeout=DOWNLOAD_TIMEOUT)
+            stale = response.status_code == 416 or (
+                response.status_code == 206 and _part_validator(response) != validator)
+            if not (offset and stale):
+                break
+            # 남아 있던 .part가 원격 파일과 맞지 않음: 잠금을 쥔 채로 처음부터 다시 받음
+            # (download_file을 다시 부르면 같은 잠금을 또 잡으려다 멈춤)
+            response.close()
+            _discard_part(part_path)
+            offset = 0
+
+        with response:
+            if response.status_code == 304:
+                return file_path
+            response.raise_for_status()
+            if response.status_code != 206:
+                offset = 0
+                _discard_part(part_path)
+                _discard_part(validator_path)
+                # 이어받기는 원본 그대로(비압축) 받은 경우에만 가능
+                new_validator = _part_validator(response)
+                if new_validator and response.headers.get("Content-Encoding", "identity") == "identity":
+                    _write_part_validator(validator_path, new_validator)
+            with open(part_path, "ab" if offset else "wb") as f:
+                for chunk in response.iter_content(DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            # Content-Length는 전송된(압축 해제 전) 바이트 수 기준
+            received = response.raw.tell()
+            etag = response.headers.get("ETag")
+            last_modified = response.headers.get("Last-Modified")
+            expected = response.headers.get("Content-Length")
+
+        # 받은 크기가 Content-Length와 다르면 .part를 남겨 두고 다음에 이어받음
+        if expected is not None and received != int(expected):
+            raise IOError(f"{file_name} 다운로드가 중간에 끊겼습니다. 다시 시도하면 이어받습니다.")
+        os.replace(part_path, file_path)
+        _discard_part(validator_path)
+        _update_manifest(file_name, _manifest_entry(file_path, url, etag, last_modified), data_dir)
+        if not quiet:
+            print(f"{file_name} 다운로드 완료 ({os.path.getsize(file_path):,} bytes)")
+    return file_path
+
+
+def columnar_path(file_name, checksum):
+    """원본 CSV 체크섬을 키로 하는 Parquet 캐시 경로."""
+    stem = os.path.splitext(file_name)[0]
+    return os.path.join(CACHE_DIR, f"{stem}-{checksum[:16]}.parquet")
+
+
+def _mark_columnar_failed(failed_path, tmp_path, error):
+    """Parquet 변환 실패를 기록 (원본 체크섬이 바뀌면 경로가 달라져 다시 시도함)."""
+    try:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        with open(failed_path, "w", encoding="utf-8") as f:
+            f.write(f"{type(error).__name__}: {error}\n")
+    except OSError:
+        pass
+
+
+def _read_columnar(file_path, file_name, columns=None):
+    """
+    CSV를 한 번만 파싱해 Parquet으로 변환하고, 이후에는 Parquet에서 필요한 컬럼만 읽음.
+    columns 중 파일에 없는 컬럼은 건너뜀.
+    Parquet 변환에 실패하면 CSV를 그대로 읽어서 반환하고, 같은 원본(체크섬)에 대해서는
+    실패 표시 파일을 남겨 다시 변환을 시도하지 않음.
+    """
+    parquet_path = columnar_path(file_name, recorded_checksum(file_name, os.path.dirname(file_path)))
+    failed_path = f"{parquet_path}.failed"
+    if os.path.exists(failed_path):
+        usecols = (lambda c: c in columns) if columns is not None else None
+        df = pd.read_csv(file_path, usecols=usecols)
+        return df[[c for c in columns if c in df.columns]] if columns is not None else df
+    if not os.path.exists(parquet_path):
+        df = pd.read_csv(file_path)
+        tmp_path = f"{parquet_path}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            df.to_parquet(tmp_path, index=False)
+            os.replace(tmp_path, parquet_path)
+        except Exception as e:
+            # pyarrow 미설치, 혼합 타입 컬럼 등으로 변환이 불가능하면 CSV 결과를 사용
+            _mark_columnar_failed(failed_path, tmp_path, e)
+        return df[[c for c in columns if c in df.columns]] if columns is not None else df
+    if columns is not None:
+        import pyarrow.parquet as pq
+        names = set(pq.read_schema(parquet_path).names)
+        columns = [c for c in columns if c in names]
+    return pd.read_parquet(parquet_path, columns=columns)
+
+
+def read_dataset(file_name, columns=None):
+    """
+    Google Drive에서 파일을 다운로드하여 DataFrame으로 반환 (캐시 없음).
+    파일이 이미 있고 manifest 기록과 일치하면 재다운로드하지 않음.
+    columns를 지정하면 해당 컬럼만 읽음.
     """
     # data 폴더가 없으면 생성
-    os.makedirs("data", exist_ok=True)
-    file_path = os.path.join("data", file_name)
+    os.makedirs(DATA_DIR, exist_ok=True)
+    file_path = os.path.join(DATA_DIR, file_name)
+    # manifest와 크기가 다르면 (끊긴 다운로드 등) 손상된 파일로 보고 다시 받음
+    corrupted = (os.path.exists(file_path) and file_name in read_manifest()
+                 and not verify_file(file_name))
     # 파일이 없으면 Google Drive에서 다운로드
-    if not os.path.exists(file_path):
-        url = GOOGLE_DRIVE_LINKS.get(file_name)
-        if url is None:
+    if not os.path.exists(file_path) or corrupted:
+        if file_name not in GOOGLE_DRIVE_LINKS:
             st.error(f"Google Drive 링크가 등록되지 않은 파일명입니다: {file_name}")
             return pd.DataFrame()
-        with st.spinner(f"{file_name} 다운로드 중..."):
-            gdown.download(url, file_path, quiet=False, fuzzy=True)
+        try:
+            with st.spinner(f"{file_name} 다운로드 중..."):
+                download_file(file_name, force=corrupted, quiet=False)
+        except Exception as e:
+            st.error(f"파일 다운로드 중 오류 발생: {e}")
+            return pd.DataFrame()
     try:
-        return pd.read_csv(file_path)
+        return _read_columnar(file_path, file_name, columns=list(columns) if columns else None)
     except Exception as e:
         st.error(f"CSV 파일을 읽는 중 오류 발생: {e}")
-        return pd.DataFrame()
\ No newline at end of file
+        return pd.DataFrame()
+
+
+@st.cache_data
+def load_data(file_name, columns=None):
+    """
+    세션별 복사본이 필요한 경우에 쓰는 캐시 로더.
+    페이지에서는 복사 없이 공유되는 utils.registry.get_dataset 사용을 권장.
+    """
+    return read_dataset(file_name, columns=columns)
+
+
+def benchmark(file_names=None, repeat=3):
+    """
+    데이터셋별 CSV 파싱과 Parquet 로딩 시간(초)을 비교.
+    `python -m utils.data_loader` 로 실행.
+    """
+    results = []
+    for file_name in file_names or GOOGLE_DRIVE_LINKS:
+        file_path = os.path.join(DATA_DIR, file_name)
+        if not os.path.exists(file_path):
+            continue
+        _read_columnar(file_path, file_name)  # Parquet 캐시 생성
+        parquet_path = columnar_path(file_name, recorded_checksum(file_name))
+        timings = {}
+        for label, reader in (("csv", lambda: pd.read_csv(file_path)),
+                              ("parquet", lambda: pd.read_parquet(parquet_path))):
+            best = float("inf")
+            for _ in range(repeat):
+                start = time.perf_counter()
+                reader()
+                best = min(best, time.perf_counter() - start)
+            timings[label] = best
+        results.append({"file": file_name, "csv_s": timings["csv"], "parquet_s": timings["parquet"],
+                        "speedup": timings["csv"] / timings["parquet"] if timings["parquet"] else float("nan")})
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string(index=False))
@@ -0,0 +1,195 @@
+"""
+한국 도서 <-> NYT 베스트셀러 유사 도서 검색.
+
+두 데이터셋의 속성 프로필(plot/character/theme/setting/tone 가중치)을 같은 어휘 공간의
+L2 정규화 벡터로 만들어 data/.cache에 .npy로 저장하고, memmap으로 읽어 블록 단위
+행렬곱 + argpartition으로 코사인 유사도 상위 k개를 찾음.
+
+    python -m utils.embeddings   # 검색 지연 시간 측정
+"""
+import hashlib
+import os
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.attributes import NYT_FILE, get_attribute_table
+from utils.data_loader import CACHE_DIR, recorded_checksum
+from utils.registry import get_dataset
+
+# 순위표만이 아니라 전체 한국 도서 카탈로그에서 찾음
+KOREAN_FILE = "book_korean.csv"
+# persona_pairs 결과의 유사도 출처 컬럼: 배포된 텍스트 임베딩 유사도 / 앱에서 계산한 속성 코사인
+SIMILARITY_SOURCE = "similarity_source"
+SHIPPED_SOURCE = "shipped"
+ATTRIBUTE_SOURCE = "attribute"
+# 한 번에 곱하는 코퍼스 행 수 (쿼리 수 x BLOCK_ROWS 점수 행렬만 메모리에 올림)
+BLOCK_ROWS = 65_536
+
+
+def build_vocabulary(*tables):
+    """속성 테이블들에 나온 (category, attribute) 쌍 -> 벡터 차원 번호."""
+    pairs = set()
+    for table in tables:
+        if not table.empty:
+            pairs.update(zip(table["category"].astype(str), table["attribute"].astype(str)))
+    return {pair: i for i, pair in enumerate(sorted(pairs))}
+
+
+def profile_vectors(table, n_books, vocabulary):
+    """속성 테이블을 (도서 수, 차원) float32 행렬로 만들고 행마다 L2 정규화."""
+    vectors = np.zeros((n_books, max(len(vocabulary), 1)), dtype=np.float32)
+    if not table.empty and vocabulary:
+        columns = [vocabulary[pair] for pair in zip(table["category"].astype(str), table["attribute"].astype(str))]
+        np.add.at(vectors, (table["book"].to_numpy(), np.asarray(columns)), table["weight"].to_numpy(dtype=np.float32))
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+
+def top_k(queries, corpus, k, block_rows=BLOCK_ROWS):
+    """
+    queries (쿼리 수, 차원)마다 corpus (행 수, 차원)에서 내적이 큰 k개를 찾음.
+    corpus를 block_rows 행씩 곱하고 블록별 후보를 합쳐 argpartition으로 줄임.
+    (행 위치, 점수) 배열을 점수 내림차순으로 반환.
+    """
+    queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+    n_rows = corpus.shape[0]
+    k = max(0, min(int(k), n_rows))
+    best_rows = np.empty((len(queries), 0), dtype=np.int64)
+    best_scores = np.empty((len(queries), 0), dtype=np.float32)
+    if k == 0:
+        return best_rows, best_scores
+    for start in range(0, n_rows, block_rows):
+        block = np.asarray(corpus[start:start + block_rows])
+        scores = np.concatenate([best_scores, queries @ block.T], axis=1)
+        rows = np.concatenate([best_rows, np.broadcast_to(np.arange(start, start + len(block)), (len(queries), len(block)))], axis=1)
+        if scores.shape[1] > k:
+            keep = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, keep, axis=1)
+            rows = np.take_along_axis(rows, keep, axis=1)
+        best_rows, best_scores = rows, scores
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    return np.take_along_axis(best_rows, order, axis=1), np.take_along_axis(best_scores, order, axis=1)
+
+
+class EmbeddingStore:
+    """한국 도서/NYT 도서 프로필 벡터 (memmap) 와 양방향 top-k 검색."""
+
+    def __init__(self, korean, nyt):
+        self.korean = korean
+        self.nyt = nyt
+
+    def similar_nyt(self, korean_rows, k=5):
+        """한국 도서 행 위치(들)마다 가장 유사한 NYT 도서 k권의 (행 위치, 유사도)."""
+        return top_k(self.korean[np.atleast_1d(korean_rows)], self.nyt, k)
+
+    def similar_korean(self, nyt_rows, k=5):
+        """NYT 도서 행 위치(들)마다 가장 유사한 한국 도서 k권의 (행 위치, 유사도)."""
+        return top_k(self.nyt[np.atleast_1d(nyt_rows)], self.korean, k)
+
+
+def embedding_paths(korean_file, nyt_file):
+    digest = hashlib.sha256()
+    for file_name in (korean_file, nyt_file):
+        digest.update(recorded_checksum(file_name).encode())
+    stem = os.path.splitext(korean_file)[0]
+    version = digest.hexdigest()[:16]
+    return (os.path.join(CACHE_DIR, f"embeddings-{stem}-{version}-korean.npy"),
+            os.path.join(CACHE_DIR, f"embeddings-{stem}-{version}-nyt.npy"))
+
+
+def build_store(korean_file=KOREAN_FILE, nyt_file=NYT_FILE):
+    """두 데이터셋의 속성 테이블로 프로필 벡터를 만듦 (저장하지 않음)."""
+    korean_table, nyt_table = get_attribute_table(korean_file), get_attribute_table(nyt_file)
+    vocabulary = build_vocabulary(korean_table, nyt_table)
+    n_korean, n_nyt = len(get_dataset(korean_file)), len(get_dataset(nyt_file))
+    return EmbeddingStore(profile_vectors(korean_table, n_korean, vocabulary),
+                          profile_vectors(nyt_table, n_nyt, vocabulary))
+
+
+@st.cache_resource(show_spinner=False)
+def get_embedding_store(korean_file=KOREAN_FILE, nyt_file=NYT_FILE):
+    """
+    프로세스 단위로 공유되는 임베딩 저장소.
+    원본 체크섬이 같으면 저장된 .npy를 memmap으로 열고, 아니면 새로 만들어 저장함.
+    """
+    if get_dataset(korean_file).empty or get_dataset(nyt_file).empty:
+        return build_store(korean_file, nyt_file)
+    korean_path, nyt_path = embedding_paths(korean_file, nyt_file)
+    if not (os.path.exists(korean_path) and os.path.exists(nyt_path)):
+        store = build_store(korean_file, nyt_file)
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            for path, vectors in ((korean_path, store.korean), (nyt_path, store.nyt)):
+                tmp_path = f"{path}.tmp"
+                with open(tmp_path, "wb") as f:
+                    np.save(f, vectors)
+                os.replace(tmp_path, path)
+        except OSError:
+            return store
+    return EmbeddingStore(np.load(korean_path, mmap_mode="r"), np.load(nyt_path, mmap_mode="r"))
+
+
+def persona_pairs(shipped, k, korean_file=KOREAN_FILE, nyt_file=NYT_FILE):
+    """
+    페르소나 추천 페어링 k쌍.
+    cluster_Similarity.csv에 있는 쌍을 먼저 쓰고, 모자라면 그 NYT 도서들과 가장 유사한
+    한국 도서를 임베딩 검색으로 찾아 유사도 순으로 채움.
+    shipped 컬럼에 SIMILARITY_SOURCE(shipped/attribute)를 더한 DataFrame을 반환.
+    두 유사도는 계산 방식이 달라 서로 비교할 수 없으므로 출처로 구분해서 보여줘야 함.
+    """
+    shipped = shipped.assign(**{SIMILARITY_SOURCE: SHIPPED_SOURCE})
+    if len(shipped) >= k:
+        return shipped.head(k).reset_index(drop=True)
+    df_nyt = get_dataset(nyt_file, columns=["title", "primary_genre", "book_image"])
+    df_korean = get_dataset(korean_file, columns=["제목", "primary_genre", "image_url"])
+    nyt_rows = pd.Series(np.arange(len(df_nyt)), index=df_nyt["title"]) if "title" in df_nyt.columns else pd.Series(dtype=int)
+    nyt_rows = nyt_rows[~nyt_rows.index.duplicated()]
+    anchors = nyt_rows.reindex(shipped["nyt_title"].unique()).dropna().astype(int).to_numpy()
+    if not len(anchors) or df_korean.empty:
+        return shipped.reset_index(drop=True)
+
+    korean_rows, scores = get_embedding_store(korean_file, nyt_file).similar_korean(anchors, k)
+    shown = set(shipped["pred_title"])
+    extra = []
+    for anchor, rows, sims in zip(anchors, korean_rows, scores):
+        nyt = df_nyt.iloc[anchor]
+        for row, sim in zip(rows, sims):
+            korean = df_korean.iloc[row]
+            extra.append({
+                "cluseter Index": shipped["cluseter Index"].iloc[0],
+                "nyt_title": nyt["title"], "nyt_genre": nyt.get("primary_genre"), "nyt_image_url": nyt.get("book_image"),
+                "pred_title": korean["제목"], "pred_genre": korean.get("primary_genre"),
+                "korean_image_url": korean.get("image_url"), "Similarity": float(sim),
+                SIMILARITY_SOURCE: ATTRIBUTE_SOURCE,
+            })
+    extra = (pd.DataFrame(extra, columns=shipped.columns)
+             .sort_values("Similarity", ascending=False, kind="stable")
+             .drop_duplicates("pred_title"))
+    extra = extra[~extra["pred_title"].isin(shown)].head(k - len(shipped))
+    return pd.concat([shipped, extra], ignore_index=True)
+
+
+def benchmark(n_korean=100_000, n_nyt=20_000, dims=300, k=10, queries=100):
+    rng = np.random.default_rng(0)
+    korean = rng.random((n_korean, dims), dtype=np.float32)
+    korean /= np.linalg.norm(korean, axis=1, keepdims=True)
+    nyt = rng.random((n_nyt, dims), dtype=np.float32)
+    nyt /= np.linalg.norm(nyt, axis=1, keepdims=True)
+    store = EmbeddingStore(korean, nyt)
+    for name, search, n in (("korean -> nyt", store.similar_nyt, n_korean),
+                            ("nyt -> korean", store.similar_korean, n_nyt)):
+        rows = rng.integers(0, n, size=queries)
+        start = time.perf_counter()
+        for row in rows:
+            search(row, k)
+        single_ms = (time.perf_counter() - start) / queries * 1000
+        start = time.perf_counter()
+        search(rows, k)
+        batch_ms = (time.perf_counter() - start) * 1000
+        print(f"{name}: {single_ms:.2f} ms per query, {batch_ms:.1f} ms for {queries} queries batched")
+
+
+if __name__ == "__main__":
+    benchmark()
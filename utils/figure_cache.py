@@ -0,0 +1,80 @@
+"""
+Plotly 차트 캐시.
+
+(데이터셋 버전, 분석 카테고리, 차트 종류, 테마) 키마다 figure를 JSON으로 직렬화해
+프로세스 단위 LRU에 보관함. 재실행이나 다른 세션에서는 value_counts/라벨 변환 없이
+저장된 spec으로 figure만 복원함.
+"""
+import threading
+from collections import OrderedDict
+import plotly.io as pio
+import streamlit as st
+from utils.data_loader import recorded_checksum
+
+# 페이지 3개 x 카테고리 6개 x 차트 3종 x 테마 2개를 넉넉히 담는 크기
+MAX_FIGURES = 256
+# builder가 None을 돌려준 경우(데이터 없음)도 기억해 두기 위한 표시
+_EMPTY = ""
+
+
+class FigureCache:
+    """figure JSON spec을 담는 스레드 안전 LRU."""
+
+    def __init__(self, max_entries=MAX_FIGURES):
+        self.max_entries = max_entries
+        self._specs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            spec = self._specs.get(key)
+            if spec is not None:
+                self._specs.move_to_end(key)
+            return spec
+
+    def put(self, key, spec):
+        with self._lock:
+            self._specs[key] = spec
+            self._specs.move_to_end(key)
+            while len(self._specs) > self.max_entries:
+                self._specs.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._specs.clear()
+
+    def __len__(self):
+        return len(self._specs)
+
+    def figure(self, key, builder):
+        """
+        key에 해당하는 figure를 반환. 없으면 builder()로 만들어 저장함.
+        builder가 None을 반환하면(그릴 데이터 없음) None을 반환.
+        """
+        spec = self.get(key)
+        if spec is None:
+            fig = builder()
+            spec = _EMPTY if fig is None else fig.to_json()
+            self.put(key, spec)
+        if spec == _EMPTY:
+            return None
+        return pio.from_json(spec)
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    return FigureCache()
+
+
+def dataset_version(file_name):
+    """차트 키에 쓰는 데이터셋 버전 (manifest에 기록된 체크섬 앞 16자리)."""
+    try:
+        return recorded_checksum(file_name)[:16]
+    except OSError:
+        return "missing"
+
+
+def cached_figure(file_name, category, kind, theme, builder):
+    """(데이터셋 버전, 카테고리, 차트 종류, 테마) 키로 캐시된 figure를 반환."""
+    key = (file_name, dataset_version(file_name), category, kind, theme)
+    return get_figure_cache().figure(key, builder)
@@ -0,0 +1,206 @@
+"""
+도서 표지 이미지 로컬 캐시.
+
+외부 호스트의 원본 표지를 한 번만 내려받아 WebP 썸네일로 static/covers에 저장하고,
+Streamlit 정적 파일 서빙(app/static/...)으로 제공함. 내려받기는 스레드 수를 제한한
+풀에서 백그라운드로 처리하고, 주소가 없거나 받을 수 없는 표지는 자리표시 이미지로 대체함.
+(정적 서빙은 .streamlit/config.toml의 server.enableStaticServing으로 켬)
+
+    python -m utils.image_cache [--workers 8]   # 데이터셋의 모든 표지를 미리 받아 둠
+"""
+import argparse
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import quote
+import requests
+import streamlit as st
+from PIL import Image, UnidentifiedImageError
+from utils.registry import get_dataset
+
+# Home.py 기준 경로. Streamlit은 static/ 아래 파일을 app/static/ 으로 제공함
+STATIC_DIR = "static"
+COVER_DIR = os.path.join(STATIC_DIR, "covers")
+STATIC_URL = "app/static/covers"
+# 카드에 쓰는 가장 큰 표지(상세 카드)보다 조금 크게 잡은 썸네일 크기
+THUMB_SIZE = (320, 480)
+WEBP_QUALITY = 80
+MAX_WORKERS = 8
+FETCH_TIMEOUT = 10
+MAX_BYTES = 10 << 20
+# 받지 못한 표지를 다시 시도하기까지의 시간 (초)
+RETRY_AFTER = 3600
+# 한 화면의 표지를 미리 받을 때 기다리는 최대 시간 (초)
+PREFETCH_WAIT = 3.0
+
+PLACEHOLDER = "data:image/svg+xml;charset=utf-8," + quote(
+    '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="300" viewBox="0 0 200 300">'
+    '<rect width="200" height="300" fill="#e9ecef"/>'
+    '<path d="M70 110h60v80H70z" fill="none" stroke="#adb5bd" stroke-width="6"/>'
+    '<path d="M85 130h30M85 150h30M85 170h20" stroke="#adb5bd" stroke-width="5"/>'
+    '</svg>'
+)
+
+# 데이터셋 -> 표지 URL 컬럼
+COVER_COLUMNS = {
+    "흥행예측도서_ranked.csv": ["image_url"],
+    "book_korean.csv": ["image_url"],
+    "nyt_bestseller_with_keyword.csv": ["book_image"],
+    "trans_final_with_url.csv": ["book_image"],
+    "cluster_Similarity.csv": ["nyt_image_url", "korean_image_url"],
+}
+
+
+def is_cover_url(url):
+    return isinstance(url, str) and url.startswith(("http://", "https://"))
+
+
+def cover_name(url):
+    return f"{hashlib.sha256(url.encode('utf-8')).hexdigest()[:24]}.webp"
+
+
+def make_thumbnail(data, size=THUMB_SIZE, quality=WEBP_QUALITY):
+    """이미지 바이트를 size 안에 들어가도록 줄인 WebP 바이트로 변환."""
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        image.thumbnail(size, Image.LANCZOS)
+        out = io.BytesIO()
+        image.save(out, "WEBP", quality=quality, method=4)
+    return out.getvalue()
+
+
+class CoverCache:
+    """표지 URL -> 로컬 WebP 썸네일. 내려받기는 max_workers개 스레드로 제한함."""
+
+    def __init__(self, directory=COVER_DIR, static_url=STATIC_URL, max_workers=MAX_WORKERS):
+        self.directory = directory
+        self.static_url = static_url
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="covers")
+        self._pending = {}
+        self._failed = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def path(self, url):
+        return os.path.join(self.directory, cover_name(url))
+
+    def _session(self):
+        # requests.Session은 스레드 간에 공유하지 않음
+        if not hasattr(self._local, "session"):
+            self._local.session = requests.Session()
+            self._local.session.headers["User-Agent"] = "Mozilla/5.0 (k-novel-dashboard cover cache)"
+        return self._local.session
+
+    def fetch(self, url):
+        """원본을 받아 썸네일로 저장. 성공하면 True."""
+        path = self.path(url)
+        try:
+            with self._session().get(url, timeout=FETCH_TIMEOUT, stream=True) as response:
+                response.raise_for_status()
+                data = response.raw.read(MAX_BYTES + 1, decode_content=True)
+            if len(data) > MAX_BYTES:
+                raise ValueError("cover too large")
+            thumbnail = make_thumbnail(data)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, path)
+            return True
+        except (requests.RequestException, UnidentifiedImageError, OSError, ValueError):
+            with self._lock:
+                self._failed[url] = time.monotonic()
+            return False
+        finally:
+            with self._lock:
+                self._pending.pop(url, None)
+
+    def _failed_recently(self, url):
+        failed_at = self._failed.get(url)
+        return failed_at is not None and time.monotonic() - failed_at < RETRY_AFTER
+
+    def submit(self, url):
+        """받아야 할 표지면 백그라운드로 내려받기를 예약하고 future를 반환 (필요 없으면 None)."""
+        if not is_cover_url(url) or os.path.exists(self.path(url)):
+            return None
+        with self._lock:
+            if self._failed_recently(url):
+                return None
+            future = self._pending.get(url)
+            if future is None:
+                future = self._pool.submit(self.fetch, url)
+                self._pending[url] = future
+            return future
+
+    def prefetch(self, urls, timeout=PREFETCH_WAIT):
+        """
+        여러 표지를 동시에 받기 시작하고 최대 timeout초 기다림 (None이면 끝날 때까지).
+        시간 안에 못 끝낸 것은 백그라운드에서 계속 받음. 새로 예약한 수를 반환.
+        """
+        futures = [f for f in (self.submit(url) for url in dict.fromkeys(urls)) if f is not None]
+        if futures and timeout != 0:
+            wait(futures, timeout=timeout)
+        return len(futures)
+
+    def src(self, url):
+        """
+        <img src>에 넣을 주소.
+        썸네일이 있으면 로컬 정적 파일, 아직 받는 중이면 원본 주소(다음 렌더링부터 로컬),
+        주소가 없거나 받을 수 없으면 자리표시 이미지.
+        """
+        if not is_cover_url(url):
+            return PLACEHOLDER
+        name = cover_name(url)
+        if os.path.exists(os.path.join(self.directory, name)):
+            return f"{self.static_url}/{name}"
+        if self.submit(url) is None:
+            return PLACEHOLDER
+        return url
+
+
+@st.cache_resource(show_spinner=False)
+def get_cover_cache():
+    return CoverCache()
+
+
+def cover_src(url):
+    """표지 URL을 카드에 넣을 주소로 바꿈 (로컬 썸네일 / 원본 / 자리표시)."""
+    return get_cover_cache().src(url)
+
+
+def prefetch_covers(urls, timeout=PREFETCH_WAIT):
+    """한 화면에 그릴 표지들을 미리 동시에 받아 둠."""
+    return get_cover_cache().prefetch([url for url in urls if is_cover_url(url)], timeout=timeout)
+
+
+def dataset_cover_urls(columns=None):
+    """데이터셋들에 나오는 표지 URL (중복 제거)."""
+    urls = {}
+    for file_name, cover_columns in (columns or COVER_COLUMNS).items():
+        df = get_dataset(file_name, columns=cover_columns)
+        for column in cover_columns:
+            if column in df.columns:
+                urls.update(dict.fromkeys(u for u in df[column].dropna() if is_cover_url(u)))
+    return list(urls)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="도서 표지 썸네일을 미리 받아 둠")
+    parser.add_argument("--directory", default=COVER_DIR)
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS)
+    args = parser.parse_args(argv)
+
+    cache = CoverCache(args.directory, max_workers=args.workers)
+    urls = dataset_cover_urls()
+    start = time.perf_counter()
+    cache.prefetch(urls, timeout=None)
+    cached = sum(os.path.exists(cache.path(url)) for url in urls)
+    print(f"{cached:,}/{len(urls):,} covers cached in {args.directory} ({time.perf_counter() - start:.1f}s)")
+    return 0 if cached == len(urls) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,74 @@
+"""
+데이터셋 공통 ISBN 인덱스.
+
+흥행예측도서_ranked.csv / book_korean.csv (ISBN)와 trans_final_with_url.csv (ISBN_K)를
+ISBN -> 행 위치 dict로 묶어 두고, 상세 패널에서 불리언 스캔이나 merge 없이
+도서 레코드를 바로 꺼내 씀.
+"""
+import pandas as pd
+import streamlit as st
+from utils.registry import get_dataset
+
+# 데이터셋 -> 한국 도서 ISBN 컬럼
+ISBN_SOURCES = {
+    "흥행예측도서_ranked.csv": "ISBN",
+    "book_korean.csv": "ISBN",
+    "trans_final_with_url.csv": "ISBN_K",
+}
+
+
+def normalize_isbn(value):
+    """정수/실수/문자열로 섞여 읽힌 ISBN을 같은 문자열 키로 맞춤."""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip().replace("-", "")
+
+
+class IsbnIndex:
+    """데이터셋별 ISBN -> 행 위치 해시 인덱스."""
+
+    def __init__(self, frames):
+        self._frames = {}
+        self._positions = {}
+        for name, (df, column) in frames.items():
+            if df.empty or column not in df.columns:
+                continue
+            positions = {}
+            for row, value in enumerate(df[column].tolist()):
+                # 중복 ISBN은 기존 boolean 스캔의 iloc[0]처럼 첫 행을 사용
+                positions.setdefault(normalize_isbn(value), row)
+            positions.pop("", None)
+            self._frames[name] = df
+            self._positions[name] = positions
+
+    def position(self, dataset, isbn):
+        """dataset에서 isbn의 행 위치. 없으면 None."""
+        return self._positions.get(dataset, {}).get(normalize_isbn(isbn))
+
+    def get(self, dataset, isbn):
+        """dataset에서 isbn에 해당하는 행(Series)을 반환. 없으면 None."""
+        row = self.position(dataset, isbn)
+        if row is None:
+            return None
+        return self._frames[dataset].iloc[row]
+
+    def lookup(self, isbn):
+        """isbn이 있는 모든 데이터셋의 레코드를 {데이터셋: Series}로 반환."""
+        key = normalize_isbn(isbn)
+        return {
+            name: self._frames[name].iloc[positions[key]]
+            for name, positions in self._positions.items()
+            if key in positions
+        }
+
+    def __contains__(self, isbn):
+        key = normalize_isbn(isbn)
+        return any(key in positions for positions in self._positions.values())
+
+
+@st.cache_resource(show_spinner=False)
+def get_isbn_index():
+    """ISBN_SOURCES 전체에 대한 공유 인덱스."""
+    return IsbnIndex({name: (get_dataset(name), column) for name, column in ISBN_SOURCES.items()})
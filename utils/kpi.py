@@ -0,0 +1,155 @@
+"""
+페이지 상단 메트릭 카드용 핵심 지표 스냅샷.
+
+흥행예측도서 / 번역도서 / 한국도서 세 데이터셋에서 카드에 쓰는 지표를 한 번에 계산해
+원본 체크섬을 버전으로 하는 작은 JSON(data/.cache/kpi-*.json)에 저장함.
+페이지는 재실행마다 스냅샷 dict만 읽음.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+import pandas as pd
+import streamlit as st
+from utils.data_loader import CACHE_DIR, recorded_checksum
+from utils.registry import get_dataset
+
+RANKED_FILE = "흥행예측도서_ranked.csv"
+TRANS_FILE = "trans_final_with_url.csv"
+BOOK_KOREAN_FILE = "book_korean.csv"
+KPI_SOURCES = [RANKED_FILE, TRANS_FILE, BOOK_KOREAN_FILE]
+# 스냅샷 계산 방식이 바뀌면 올려서 이전 스냅샷을 무효화
+SNAPSHOT_FORMAT = 2
+
+
+def _mean(df, column):
+    if column not in df.columns:
+        return None
+    # float32 스키마 컬럼도 float64로 합산해 누적 오차를 막음
+    value = pd.to_numeric(df[column], errors="coerce").astype("float64").mean()
+    return None if pd.isna(value) else float(value)
+
+
+def _nunique(df, column):
+    return int(df[column].nunique()) if column in df.columns else 0
+
+
+def _ratio(part, whole):
+    return part / whole * 100 if whole else None
+
+
+def compute_kpis(df_ranked, df_trans, df_book_korean):
+    """카드 지표 전체를 계산해 {지표명: 값} dict로 반환 (계산할 수 없는 값은 None)."""
+    kpis = {}
+    translated = _nunique(df_trans, "ISBN_K")
+    untranslated = _nunique(df_book_korean, "ISBN")
+    success = _nunique(df_ranked, "ISBN")
+    kpis.update(
+        translated_count=translated,
+        untranslated_count=untranslated,
+        translation_percentage=_ratio(translated, translated + untranslated),
+        success_count=success,
+        success_percentage=_ratio(success, success + untranslated),
+        ranked_score_mean=_mean(df_ranked, "fuzzy_topsis_score"),
+        ranked_salespoint_mean=_mean(df_ranked, "salespoint"),
+        ranked_nyb_max_s_mean=_mean(df_ranked, "nyb_max_s"),
+        trans_salespoint_mean=_mean(df_trans, "salespoint"),
+        trans_similarity_mean=_mean(df_trans, "top_1_similarity"),
+        korean_salespoint_mean=_mean(df_book_korean, "salespoint"),
+        korean_imdb_similarity_mean=_mean(df_book_korean, "max_imdb_similarity"),
+        korean_nyb_max_s_mean=_mean(df_book_korean, "nyb_max_s"),
+    )
+    if kpis["korean_nyb_max_s_mean"] is None:
+        kpis["korean_nyb_max_s_mean"] = kpis["ranked_nyb_max_s_mean"]
+
+    # 흥행/비흥행 번역도서 지표는 success 기준 groupby 한 번으로 계산
+    group_columns = {"nyb_max_s": "nyb_max_s", "amazon_rating_clean": "amazon_rating",
+                     "amazon_review_count": "review_count"}
+    present = [c for c in group_columns if c in df_trans.columns]
+    if "success" in df_trans.columns and not df_trans.empty:
+        grouped = df_trans[present].apply(pd.to_numeric, errors="coerce").astype("float64").groupby(df_trans["success"])
+        means = grouped.mean()
+        counts = df_trans.groupby("success")["ISBN"].nunique() if "ISBN" in df_trans.columns else pd.Series(dtype=int)
+    else:
+        means, counts = pd.DataFrame(), pd.Series(dtype=int)
+    for flag, suffix in ((1, "success"), (0, "fail")):
+        for column, name in group_columns.items():
+            value = means[column].get(flag) if column in means.columns else None
+            kpis[f"trans_{name}_{suffix}"] = None if value is None or pd.isna(value) else float(value)
+        kpis[f"trans_{suffix}_count"] = int(counts.get(flag, 0))
+    kpis["trans_success_percentage"] = _ratio(kpis["trans_success_count"],
+                                              kpis["trans_success_count"] + kpis["trans_fail_count"])
+
+    # 한국도서 중 흥행 예측도서에 들지 않은 도서의 판매지수
+    if {"ISBN", "salespoint"} <= set(df_book_korean.columns) and "ISBN" in df_ranked.columns:
+        not_hit = df_book_korean.loc[~df_book_korean["ISBN"].isin(df_ranked["ISBN"].unique())]
+        kpis["korean_salespoint_miss_mean"] = _mean(not_hit, "salespoint")
+    else:
+        kpis["korean_salespoint_miss_mean"] = None
+    return kpis
+
+
+def snapshot_version(files=KPI_SOURCES):
+    """원본 데이터셋 체크섬으로 만든 스냅샷 버전 문자열."""
+    digest = hashlib.sha256(str(SNAPSHOT_FORMAT).encode())
+    for file_name in files:
+        try:
+            digest.update(recorded_checksum(file_name).encode())
+        except OSError:
+            digest.update(b"missing")
+    return digest.hexdigest()[:16]
+
+
+def snapshot_path(version):
+    return os.path.join(CACHE_DIR, f"kpi-{version}.json")
+
+
+def build_snapshot():
+    """세 데이터셋을 읽어 스냅샷 dict({version, computed_at, metrics})를 만듦."""
+    frames = [get_dataset(file_name) for file_name in KPI_SOURCES]
+    return {
+        "version": snapshot_version(),
+        "computed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "metrics": compute_kpis(*frames),
+    }
+
+
+@st.cache_resource(show_spinner=False)
+def get_kpi_snapshot():
+    """
+    프로세스 단위로 공유되는 지표 스냅샷.
+    원본 체크섬이 같으면 저장된 JSON을 그대로 읽고, 아니면 다시 계산해 저장함.
+    """
+    version = snapshot_version()
+    path = snapshot_path(version)
+    if os.path.exists(path):
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except ValueError:
+            pass
+    snapshot = build_snapshot()
+    if any(get_dataset(file_name).empty for file_name in KPI_SOURCES):
+        # 다운로드 실패 등으로 빈 데이터셋이 섞여 있으면 저장하지 않음
+        return snapshot
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(snapshot, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+    return snapshot
+
+
+def get_kpis():
+    """스냅샷의 지표 dict."""
+    return get_kpi_snapshot()["metrics"]
+
+
+def format_metric(value, spec, template="{}"):
+    """지표 값을 spec 형식으로 template에 넣음. 값이 없으면 'N/A'."""
+    if value is None:
+        return "N/A"
+    return template.format(format(value, spec))
@@ -0,0 +1,67 @@
+"""
+Google Drive 데이터셋 사전 다운로드(워밍업).
+
+    python -m utils.prefetch [--workers 4] [--refresh] [--force]
+"""
+import argparse
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import streamlit as st
+from utils.data_loader import DATA_DIR, GOOGLE_DRIVE_LINKS, download_file, read_manifest
+
+
+def prefetch_all(links=None, data_dir=DATA_DIR, max_workers=4, force=False, refresh=False):
+    """
+    links의 모든 파일을 스레드 풀로 동시에 내려받음 (links 순서대로 요청을 넣음).
+    이미 있는 파일은 건너뛰고, refresh=True면 원격 파일이 바뀐 경우에만 다시 받음.
+    파일명별 결과("ok" 또는 오류 메시지)를 links 순서의 dict로 반환.
+    """
+    links = GOOGLE_DRIVE_LINKS if links is None else links
+    results = dict.fromkeys(links)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(download_file, name, url, data_dir, force, refresh): name
+            for name, url in links.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                future.result()
+                results[name] = "ok"
+            except Exception as e:
+                results[name] = f"error: {e}"
+    return results
+
+
+@st.cache_resource(show_spinner=False)
+def start_background_prefetch(max_workers=4, links=None, data_dir=DATA_DIR):
+    """
+    프로세스당 한 번, 백그라운드 스레드에서 prefetch_all을 실행하고 바로 Future를 반환.
+    첫 방문자가 다운로드를 기다리지 않도록 Home.py에서 호출함.
+    """
+    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+    future = executor.submit(prefetch_all, links, data_dir, max_workers)
+    executor.shutdown(wait=False)
+    return future
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="데이터셋 사전 다운로드")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--refresh", action="store_true", help="원격 파일이 바뀐 경우에만 다시 받음")
+    parser.add_argument("--force", action="store_true", help="이미 있는 파일도 다시 받음")
+    args = parser.parse_args(argv)
+
+    results = prefetch_all(data_dir=args.data_dir, max_workers=args.workers,
+                           force=args.force, refresh=args.refresh)
+    manifest = read_manifest(args.data_dir)
+    for name, status in sorted(results.items()):
+        entry = manifest.get(name, {})
+        print(f"{status:>6}  {entry.get('sha256', '-')[:16]}  {entry.get('size', 0):>12,}  "
+              f"{entry.get('fetched_at', '-')}  {os.path.join(args.data_dir, name)}")
+    return 0 if all(status == "ok" for status in results.values()) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
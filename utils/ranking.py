@@ -0,0 +1,164 @@
+"""
+흥행예측도서 순위표의 정렬/필터 구조.
+
+정렬 기준별 순열(argsort)과 장르별 비트마스크를 한 번만 만들어 두고,
+재실행 때는 정렬/검색/장르 조합을 순열 마스킹만으로 처리함.
+
+    python -m utils.ranking   # 재실행 지연 시간 비교
+"""
+import copy
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.registry import get_dataset
+from utils.taxonomy import map_labels
+
+RANKED_FILE = "흥행예측도서_ranked.csv"
+SORT_COLUMNS = ['fuzzy_rank', 'salespoint', 'nyb_max_s', 'nyt_genre_score', 'imdb_genre_score', 'fuzzy_topsis_score']
+# 브라우저로 한 번에 보내는 순위표 행 수
+PAGE_SIZE = 50
+DISPLAY_COLUMNS = ['fuzzy_rank', '제목', '저자', 'primary_genre', 'salespoint', 'nyb_max_s', 'nyt_genre_score',
+                   'imdb_genre_score', 'fuzzy_topsis_score', 'ISBN']
+
+
+def sort_permutation(values, ascending):
+    """sort_values와 같이 NaN은 항상 맨 뒤로 가는 안정 정렬 순열."""
+    values = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype="float64")
+    return np.argsort(values if ascending else -values, kind="stable").astype(np.int32)
+
+
+class RankingView:
+    """
+    순위표 한 개에 대한 정렬 순열, 장르 마스크, 표시용 프레임 묶음.
+    order()가 돌려주는 행 위치 배열로 표시용 프레임과 ISBN을 함께 찾음.
+    """
+
+    def __init__(self, df, genre_labels=None, display_labels=None, sort_columns=SORT_COLUMNS):
+        self.size = len(df)
+        self.isbn = df['ISBN'].to_numpy() if 'ISBN' in df.columns else np.full(self.size, None)
+        self._perms = {}
+        for col in sort_columns:
+            if col in df.columns:
+                self._perms[(col, True)] = sort_permutation(df[col], True)
+                self._perms[(col, False)] = sort_permutation(df[col], False)
+
+        self.genres = []
+        self._genre_masks = {}
+        if 'primary_genre' in df.columns:
+            genre = df['primary_genre']
+            self.genres = sorted(genre.dropna().unique().tolist())
+            self._genre_masks = {g: (genre == g).to_numpy() for g in self.genres}
+
+        display = df[[c for c in DISPLAY_COLUMNS if c in df.columns]].reset_index(drop=True)
+        if genre_labels and 'primary_genre' in display.columns:
+            # 장르 코드별 라벨표에서 take (category 코드를 그대로 씀)
+            display['primary_genre'] = map_labels(display['primary_genre'], genre_labels)
+        self._labels = {c: (display_labels or {}).get(c, c) for c in display.columns}
+        display.columns = [self._labels[c] for c in display.columns]
+        self.display = display
+        self.scores = None
+
+    def order(self, sort_by, ascending=True, rows=None, genres=None):
+        """
+        정렬 기준/순서에 맞춘 행 위치 배열.
+        rows: 검색 결과 행 위치 (None이면 전체), genres: 포함할 장르 목록.
+        """
+        perm = self._perms.get((sort_by, ascending))
+        if perm is None:
+            perm = np.arange(self.size, dtype=np.int32)
+        if rows is None and not genres:
+            return perm
+        mask = np.ones(self.size, dtype=bool)
+        if rows is not None:
+            mask[:] = False
+            mask[rows] = True
+        if genres:
+            genre_mask = np.zeros(self.size, dtype=bool)
+            for g in genres:
+                if g in self._genre_masks:
+                    genre_mask |= self._genre_masks[g]
+            mask &= genre_mask
+        return perm[mask[perm]]
+
+    def rescored(self, scores):
+        """
+        fuzzy_topsis_score를 scores로 바꾸고 fuzzy_rank를 다시 매긴 뷰를 반환 (원본 뷰는 그대로).
+        두 기준의 순열과 표시용 프레임의 두 컬럼만 새로 만듦.
+        """
+        scores = np.asarray(scores, dtype="float64")
+        view = copy.copy(self)
+        view.scores = scores
+        view._perms = dict(self._perms)
+        best_first = sort_permutation(scores, False)
+        rank = np.empty(self.size, dtype=np.int32)
+        rank[best_first] = np.arange(1, self.size + 1, dtype=np.int32)
+        view._perms[('fuzzy_topsis_score', False)] = best_first
+        view._perms[('fuzzy_topsis_score', True)] = sort_permutation(scores, True)
+        view._perms[('fuzzy_rank', True)] = best_first
+        view._perms[('fuzzy_rank', False)] = best_first[::-1].copy()
+        updates = {}
+        if 'fuzzy_topsis_score' in self._labels:
+            updates[self._labels['fuzzy_topsis_score']] = scores
+        if 'fuzzy_rank' in self._labels:
+            updates[self._labels['fuzzy_rank']] = rank
+        view.display = self.display.assign(**updates)
+        return view
+
+    def frame(self, order):
+        """표시용 프레임에서 order 순서의 행만 꺼냄."""
+        return self.display.take(order)
+
+
+def page_count(n_rows, page_size=PAGE_SIZE):
+    return max(1, -(-n_rows // page_size))
+
+
+def page_window(order, page, page_size=PAGE_SIZE):
+    """
+    1부터 시작하는 page 번호에 해당하는 order 구간과 시작 위치를 반환.
+    선택된 행 i는 order[start + i]로 원래 행 위치를 찾음.
+    """
+    page = min(max(1, int(page)), page_count(len(order), page_size))
+    start = (page - 1) * page_size
+    return order[start:start + page_size], start
+
+
+@st.cache_resource(show_spinner=False)
+def get_ranking_view(genre_labels=None, display_labels=None):
+    """흥행예측도서 순위표 구조 (프로세스 단위 공유)."""
+    return RankingView(get_dataset(RANKED_FILE), genre_labels, display_labels)
+
+
+def _rerun_before(df, sort_by, ascending, genres, display_labels, genre_labels):
+    filtered = df[df['primary_genre'].isin(genres)] if genres else df
+    sorted_df = filtered.sort_values(by=sort_by, ascending=ascending).reset_index(drop=True)
+    display = sorted_df[DISPLAY_COLUMNS].copy()
+    display['primary_genre'] = display['primary_genre'].map(lambda x: genre_labels.get(x, x) if pd.notna(x) else x)
+    display.columns = [display_labels.get(c, c) for c in display.columns]
+    return display
+
+
+def benchmark(n_rows=200_000, repeat=5):
+    df = get_dataset(RANKED_FILE)
+    big = pd.concat([df] * max(1, n_rows // max(len(df), 1)), ignore_index=True)
+    genre_labels = {g: f"* {g}" for g in big['primary_genre'].dropna().unique()}
+    display_labels = {c: c.upper() for c in DISPLAY_COLUMNS}
+    start = time.perf_counter()
+    view = RankingView(big, genre_labels, display_labels)
+    print(f"view build: {len(big):,} rows in {time.perf_counter() - start:.2f}s")
+    genres = view.genres[:2]
+    for sort_by in SORT_COLUMNS:
+        before = after = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _rerun_before(big, sort_by, False, genres, display_labels, genre_labels)
+            before = min(before, time.perf_counter() - start)
+            start = time.perf_counter()
+            view.frame(view.order(sort_by, False, genres=genres))
+            after = min(after, time.perf_counter() - start)
+        print(f"{sort_by:>20}: before {before * 1000:8.1f} ms  after {after * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,133 @@
+import threading
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.data_loader import GOOGLE_DRIVE_LINKS, read_dataset
+from utils.schema import apply_schema, column_bytes
+
+
+def _freeze(df):
+    """
+    프레임이 가진 numpy 배열을 읽기 전용으로 바꿈 (칸 단위 수정은 ValueError).
+    category는 코드 배열, nullable 정수/불리언은 값/마스크 배열을 막고, Arrow 문자열은 원래 불변.
+    """
+    for values in df._mgr.arrays:
+        if isinstance(values, np.ndarray):
+            arrays = [values]
+        elif isinstance(values, pd.Categorical):
+            arrays = [values._ndarray]
+        elif hasattr(values, "_mask"):
+            arrays = [values._data, values._mask]
+        else:
+            arrays = []
+        for array in arrays:
+            array.flags.writeable = False
+    return df
+
+
+class DatasetRegistry:
+    """
+    프로세스 단위 데이터셋 저장소.
+    데이터셋마다 한 번만 로드하고(utils.schema 타입 적용), 모든 세션이 같은 프레임을 공유함.
+    일부 컬럼만 요청하면 (파일, 컬럼) 단위로 한 번만 만들어 두고, 전체가 아직 로드되지 않았으면
+    파일에서도 그 컬럼만 읽음. 공유 프레임의 배열은 모두 읽기 전용.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._projections = {}
+        self._locks = {name: threading.Lock() for name in GOOGLE_DRIVE_LINKS}
+        self._guard = threading.Lock()
+
+    def _lock_for(self, file_name):
+        with self._guard:
+            return self._locks.setdefault(file_name, threading.Lock())
+
+    def get(self, file_name, columns=None):
+        """데이터셋 프레임. columns를 주면 그 컬럼만 있는 프레임 (없는 컬럼은 건너뜀)."""
+        key = (file_name, tuple(columns)) if columns is not None else None
+        df = self._frames.get(file_name) if key is None else self._projections.get(key)
+        if df is not None:
+            return df
+        # 같은 파일을 여러 세션이 동시에 요청해도 한 번만 읽음
+        with self._lock_for(file_name):
+            if key is None:
+                df = self._frames.get(file_name)
+                if df is None:
+                    df = read_dataset(file_name)
+                    # 다운로드/파싱 실패로 비어 있으면 다음 요청에서 다시 시도
+                    if not df.empty:
+                        df = _freeze(apply_schema(file_name, df))
+                        self._frames[file_name] = df
+                return df
+            df = self._projections.get(key)
+            if df is None:
+                full = self._frames.get(file_name)
+                if full is not None:
+                    df = full[[c for c in columns if c in full.columns]]
+                else:
+                    df = read_dataset(file_name, columns=columns)
+                    if not df.empty:
+                        df = apply_schema(file_name, df)
+                if not df.empty:
+                    df = _freeze(df)
+                    self._projections[key] = df
+        return df
+
+    def loaded(self):
+        return dict(self._frames)
+
+
+@st.cache_resource(show_spinner=False)
+def get_registry():
+    return DatasetRegistry()
+
+
+def get_dataset(file_name, columns=None):
+    """
+    공유 데이터셋을 반환. columns를 주면 (파일, 컬럼)마다 한 번 만들어 둔 부분 프레임.
+    데이터는 복사하지 않고 얕은 복사본(컬럼 목록만 새로 만듦)을 돌려주므로,
+    컬럼 추가/통째 대입(df[col] = ...)은 공유 프레임에 영향이 없음.
+    배열이 읽기 전용이라 칸 단위 수정(.loc[...] = , inplace 등)은 ValueError가 남.
+    """
+    return get_registry().get(file_name, columns=columns).copy(deep=False)
+
+
+def memory_usage():
+    """로드된 데이터셋별 행/열 수와 메모리 사용량(bytes)."""
+    rows = [
+        {
+            "dataset": name,
+            "rows": len(df),
+            "columns": df.shape[1],
+            "bytes": int(df.memory_usage(deep=True).sum()),
+        }
+        for name, df in get_registry().loaded().items()
+    ]
+    return pd.DataFrame(rows, columns=["dataset", "rows", "columns", "bytes"])
+
+
+def memory_report(file_names=None):
+    """
+    데이터셋/컬럼별 스키마 적용 전후 dtype과 메모리 사용량(bytes).
+    적용 전 값은 원본을 다시 읽어서 잼 (로드되지 않은 데이터셋은 이때 로드됨).
+    """
+    rows = []
+    for name in file_names or GOOGLE_DRIVE_LINKS:
+        after = get_registry().get(name)
+        if after.empty:
+            continue
+        before = read_dataset(name)
+        before_bytes, after_bytes = column_bytes(before), column_bytes(after)
+        for column in after.columns:
+            rows.append({
+                "dataset": name,
+                "column": column,
+                "dtype_before": str(before[column].dtype),
+                "dtype_after": str(after[column].dtype),
+                "bytes_before": int(before_bytes[column]),
+                "bytes_after": int(after_bytes[column]),
+            })
+    report = pd.DataFrame(rows, columns=["dataset", "column", "dtype_before", "dtype_after", "bytes_before", "bytes_after"])
+    report["saved_pct"] = (1 - report["bytes_after"] / report["bytes_before"].where(report["bytes_before"] > 0)) * 100
+    return report
@@ -0,0 +1,114 @@
+"""
+리뷰 감정 키워드 집계.
+
+reviews_final_with_clusters.csv의 parsed_keywords를 한 번만 펼쳐
+(cluster, emotion_group, emotion, count) 테이블로 만들고,
+페르소나(클러스터)별 감정 빈도를 바로 꺼내 쓸 수 있게 캐시함.
+
+    python -m utils.reviews   # 10배/100배 리뷰 규모 마이크로 벤치마크
+"""
+import json
+import time
+from collections import Counter
+import pandas as pd
+import streamlit as st
+from utils.registry import get_dataset
+
+REVIEWS_FILE = "reviews_final_with_clusters.csv"
+EMOTION_GROUPS = ["emotions_positive", "emotions_negative", "emotions_complex"]
+
+
+def parse_keywords(value):
+    """parsed_keywords 문자열을 dict로 변환. 실패하면 빈 dict."""
+    if isinstance(value, dict):
+        return value
+    try:
+        return json.loads(value.replace("'", '"')) if isinstance(value, str) else {}
+    except (ValueError, AttributeError):
+        return {}
+
+
+def build_emotion_counts(df_reviews):
+    """리뷰 전체를 한 번 훑어 (cluster, emotion_group, emotion, count) 테이블을 만듦."""
+    records = []
+    for cluster, raw in zip(df_reviews["cluster"].tolist(), df_reviews["parsed_keywords"].tolist()):
+        parsed = parse_keywords(raw)
+        if not isinstance(parsed, dict):
+            continue
+        for group in EMOTION_GROUPS:
+            emotions = parsed.get(group)
+            if isinstance(emotions, dict):
+                records.extend((cluster, group, emotion) for emotion in emotions)
+    exploded = pd.DataFrame(records, columns=["cluster", "emotion_group", "emotion"])
+    return (
+        exploded.groupby(["cluster", "emotion_group", "emotion"], sort=True)
+        .size()
+        .rename("count")
+        .reset_index()
+    )
+
+
+def counts_by_cluster(emotion_counts):
+    """클러스터 -> 감정별 빈도 Series (감정 그룹 합산) dict."""
+    totals = emotion_counts.groupby(["cluster", "emotion"])["count"].sum()
+    return {cluster: totals.xs(cluster) for cluster in totals.index.unique(level="cluster")}
+
+
+@st.cache_resource(show_spinner=False)
+def get_cluster_emotions():
+    """프로세스 단위로 공유되는 클러스터별 감정 빈도."""
+    df_reviews = get_dataset(REVIEWS_FILE, columns=["cluster", "parsed_keywords"])
+    if df_reviews.empty:
+        return {}
+    return counts_by_cluster(build_emotion_counts(df_reviews))
+
+
+def emotion_profile(cluster_emotions, cluster, labels):
+    """레이더 차트용: labels 순서대로 감정 빈도를 반환 (없으면 0)."""
+    counts = cluster_emotions.get(cluster)
+    if counts is None:
+        return [0] * len(labels)
+    return counts.reindex(labels, fill_value=0).astype(int).tolist()
+
+
+def _per_rerun_loop(df_reviews, cluster, labels):
+    """기존 페이지의 재실행마다 돌던 iterrows + Counter 방식 (비교용)."""
+    cluster_df = df_reviews[df_reviews["cluster"] == cluster]
+    counter = Counter()
+    for _, row in cluster_df.iterrows():
+        parsed = row.get("parsed_keywords", {})
+        if isinstance(parsed, dict):
+            for key in EMOTION_GROUPS:
+                if key in parsed and isinstance(parsed[key], dict):
+                    counter.update(parsed[key].keys())
+    return [counter.get(label, 0) for label in labels]
+
+
+def benchmark(scales=(1, 10, 100), cluster=0):
+    df = get_dataset(REVIEWS_FILE, columns=["cluster", "parsed_keywords"])
+    labels = sorted({e for v in df["parsed_keywords"].map(parse_keywords)
+                     for g in EMOTION_GROUPS for e in (v.get(g) or {})})
+    results = []
+    for scale in scales:
+        scaled = pd.concat([df] * scale, ignore_index=True)
+        parsed = scaled.assign(parsed_keywords=scaled["parsed_keywords"].map(parse_keywords))
+
+        start = time.perf_counter()
+        expected = _per_rerun_loop(parsed, cluster, labels)
+        loop_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cluster_emotions = counts_by_cluster(build_emotion_counts(scaled))
+        build_s = time.perf_counter() - start
+
+        start = time.perf_counter()
+        profile = emotion_profile(cluster_emotions, cluster, labels)
+        lookup_s = time.perf_counter() - start
+        assert profile == expected
+        results.append({"reviews": len(scaled), "per_rerun_loop_s": loop_s,
+                        "one_time_build_s": build_s, "lookup_s": lookup_s})
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    print(benchmark().to_string(index=False))
@@ -0,0 +1,64 @@
+"""
+데이터셋별 컬럼 타입 스키마.
+
+CSV/Parquet에서 읽은 그대로는 문자열이 파이썬 객체(object), 숫자가 int64/float64라
+메모리를 많이 차지함. 로드할 때 한 번 적용해 다음처럼 줄임.
+
+- 값 종류가 적은 컬럼(장르, 대표 속성, 출판사): category
+- 정수: 값 범위에 맞는 가장 작은 정수형 (ISBN처럼 큰 값은 int64 유지)
+- 실수: float32
+- 나머지 문자열(제목, 소개글, 속성 JSON 등): Arrow 문자열 (결측은 기존처럼 NaN)
+
+category 컬럼을 걸러서 value_counts를 하면 빈 범주도 0으로 나오므로, 필터 후 집계에는
+observed=True 또는 astype(object)를 써야 함.
+"""
+import numpy as np
+import pandas as pd
+
+# 데이터셋 -> category로 둘 컬럼
+CATEGORY_COLUMNS = {
+    "흥행예측도서_ranked.csv": ["출판사", "primary_genre"],
+    "book_korean.csv": ["출판사", "primary_genre"],
+    "trans_final_with_url.csv": [
+        "출판사", "primary_genre", "primary_plot", "primary_character",
+        "primary_theme", "primary_setting", "primary_tone",
+    ],
+    "nyt_bestseller_with_keyword.csv": ["primary_genre"],
+    "imdb_llm_filtered_final.csv": ["primary_genre"],
+}
+# 타입을 바꾸지 않는 컬럼 (조회 키로 쓰는 ISBN은 원래 값 그대로 둠)
+KEEP_COLUMNS = {"ISBN", "ISBN_K"}
+
+TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)
+
+
+def column_dtype(file_name, column, series):
+    """컬럼에 적용할 dtype. 바꾸지 않으면 None."""
+    if column in KEEP_COLUMNS:
+        return None
+    if column in CATEGORY_COLUMNS.get(file_name, ()):
+        return "category"
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_integer_dtype(series):
+        return pd.to_numeric(series, downcast="integer").dtype
+    if pd.api.types.is_float_dtype(series):
+        return np.dtype("float32")
+    if series.dtype == object and pd.api.types.infer_dtype(series, skipna=True) in ("string", "empty"):
+        return TEXT_DTYPE
+    return None
+
+
+def apply_schema(file_name, df):
+    """데이터셋 스키마를 적용한 새 DataFrame. 바꿀 컬럼이 없으면 그대로 반환."""
+    dtypes = {}
+    for column in df.columns:
+        dtype = column_dtype(file_name, column, df[column])
+        if dtype is not None and dtype != df[column].dtype:
+            dtypes[column] = dtype
+    return df.astype(dtypes) if dtypes else df
+
+
+def column_bytes(df):
+    """컬럼별 메모리 사용량 (bytes, 문자열 내용 포함)."""
+    return df.memory_usage(deep=True, index=False)
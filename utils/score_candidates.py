@@ -0,0 +1,236 @@
+"""
+번역되지 않은 신규 한국 도서의 흥행 예측 점수 배치 계산.
+
+입력 CSV(기본 book_korean.csv)를 청크 단위로 읽어 도서별 특징을 계산하고
+퍼지 TOPSIS로 순위를 매겨 대시보드가 읽는 흥행예측도서_ranked.csv 형식으로 저장함.
+기본 출력은 별도 파일(흥행예측도서_candidates.csv)이고, 대시보드 파일은 --replace-ranked와
+--top(저장할 권수)을 함께 줬을 때만 바꿈.
+
+- nyb_max_s: 모든 행을 NYT 베스트셀러와의 속성 프로필 코사인 유사도 최댓값으로 다시 계산
+  (입력의 nyb_max_s는 다른 방식의 유사도라 섞지 않고 무시함, 속성이 없는 행은 결측)
+- nyt_genre_score / imdb_genre_score: 대표 장르가 NYT 베스트셀러 / K-콘텐츠에서 차지하는
+  비중 (가장 많은 장르 = 1)
+- fuzzy_topsis_score / fuzzy_rank: utils.topsis 기본 가중치
+
+특징은 행 내용 해시를 키로 <data-dir>/.cache/pipeline/ 에 청크마다 체크포인트로 저장하므로,
+다시 실행하면 바뀌거나 새로 들어온 행만 계산함. 청크는 프로세스 풀에서 병렬로 처리.
+
+    python -m utils.score_candidates [--input data/book_korean.csv] [--workers 4] [--top 500]
+    python -m utils.score_candidates --replace-ranked --top 100   # 대시보드 순위 파일을 교체
+"""
+import argparse
+import hashlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from utils.attributes import ATTRIBUTE_COLUMNS, NYT_FILE, build_attribute_table
+from utils.data_loader import DATA_DIR, download_file, file_checksum, register_local_file
+from utils.embeddings import build_vocabulary, profile_vectors, top_k
+from utils.topsis import DEFAULT_WEIGHTS, topsis_scores
+
+INPUT_FILE = "book_korean.csv"
+OUTPUT_FILE = "흥행예측도서_candidates.csv"
+# 대시보드가 읽는 순위 파일
+RANKED_FILE = "흥행예측도서_ranked.csv"
+IMDB_FILE = "imdb_llm_filtered_final.csv"
+FEATURE_COLUMNS = ["nyb_max_s", "nyt_genre_score", "imdb_genre_score"]
+# 특징 계산 방식이 바뀌면 올려서 이전 체크포인트를 무효화
+PIPELINE_VERSION = 2
+
+# 워커 프로세스마다 한 번만 받는 참조 데이터 (NYT 프로필 벡터, 장르 비중)
+_context = None
+
+
+def genre_shares(genres):
+    """장르별 비중을 가장 많은 장르가 1이 되도록 나눈 dict."""
+    counts = pd.Series(genres).dropna().value_counts()
+    return (counts / counts.max()).to_dict() if len(counts) else {}
+
+
+def build_context(data_dir=DATA_DIR):
+    """NYT/IMDB 참조 데이터에서 특징 계산에 필요한 값과 버전 문자열을 만듦."""
+    columns = [source for source, _ in ATTRIBUTE_COLUMNS.values()]
+    paths = {}
+    for file_name in (NYT_FILE, IMDB_FILE):
+        paths[file_name] = os.path.join(data_dir, file_name)
+        if not os.path.exists(paths[file_name]):
+            download_file(file_name, data_dir=data_dir)
+    df_nyt = pd.read_csv(paths[NYT_FILE], usecols=lambda c: c in columns or c == "primary_genre")
+    df_imdb = pd.read_csv(paths[IMDB_FILE], usecols=["primary_genre"])
+    nyt_table = build_attribute_table(df_nyt)
+    vocabulary = build_vocabulary(nyt_table)
+    digest = hashlib.sha256(str(PIPELINE_VERSION).encode())
+    for path in paths.values():
+        digest.update(file_checksum(path).encode())
+    return {
+        "version": digest.hexdigest()[:16],
+        "vocabulary": vocabulary,
+        "nyt_vectors": profile_vectors(nyt_table, len(df_nyt), vocabulary),
+        "nyt_genres": genre_shares(df_nyt.get("primary_genre")),
+        "imdb_genres": genre_shares(df_imdb["primary_genre"]),
+    }
+
+
+def checkpoint_dir(data_dir=DATA_DIR):
+    """data 폴더별 체크포인트 폴더 (utils.data_loader.CACHE_DIR와 같은 구조)."""
+    return os.path.join(data_dir, ".cache", "pipeline")
+
+
+def _init_worker(context):
+    global _context
+    _context = context
+
+
+def max_similarity(chunk, vocabulary, nyt_vectors):
+    """도서마다 NYT 베스트셀러와의 속성 프로필 코사인 유사도 최댓값 (속성이 없으면 NaN)."""
+    table = build_attribute_table(chunk)
+    if table.empty or not len(nyt_vectors):
+        return np.full(len(chunk), np.nan)
+    # NYT에 없는 속성도 노름에는 포함해야 코사인이 맞음
+    norms = np.sqrt(
+        (table["weight"].astype("float64") ** 2).groupby(table["book"]).sum()
+        .reindex(range(len(chunk)), fill_value=0).to_numpy()
+    )
+    in_vocab = table[[(c, a) in vocabulary for c, a in zip(table["category"].astype(str), table["attribute"].astype(str))]]
+    vectors = np.zeros((len(chunk), nyt_vectors.shape[1]), dtype=np.float32)
+    if not in_vocab.empty:
+        columns = [vocabulary[(c, a)] for c, a in zip(in_vocab["category"].astype(str), in_vocab["attribute"].astype(str))]
+        np.add.at(vectors, (in_vocab["book"].to_numpy(), np.asarray(columns)), in_vocab["weight"].to_numpy(dtype=np.float32))
+    np.divide(vectors, norms[:, None], out=vectors, where=norms[:, None] > 0)
+    _, scores = top_k(vectors, nyt_vectors, 1)
+    return np.where(norms > 0, scores[:, 0], np.nan)
+
+
+def compute_features(chunk, context=None):
+    """청크의 도서별 특징 (FEATURE_COLUMNS) DataFrame. 청크와 같은 순서."""
+    context = context or _context
+    chunk = chunk.reset_index(drop=True)
+    features = pd.DataFrame(index=chunk.index)
+    # 입력 값과 섞지 않고 모든 행을 같은 방식으로 계산
+    features["nyb_max_s"] = max_similarity(chunk, context["vocabulary"], context["nyt_vectors"])
+    genre = chunk["primary_genre"] if "primary_genre" in chunk.columns else pd.Series(None, index=chunk.index)
+    features["nyt_genre_score"] = genre.map(context["nyt_genres"]).fillna(0.0).astype("float64")
+    features["imdb_genre_score"] = genre.map(context["imdb_genres"]).fillna(0.0).astype("float64")
+    return features
+
+
+def row_hashes(chunk):
+    """행 내용 해시 (같은 도서 정보면 같은 값)."""
+    return pd.util.hash_pandas_object(chunk, index=False).astype("uint64").to_numpy()
+
+
+class FeatureCheckpoint:
+    """행 해시 -> 특징 저장소. 청크를 처리할 때마다 Parquet으로 원자적으로 저장함."""
+
+    def __init__(self, version, directory=None):
+        directory = directory or checkpoint_dir()
+        self.path = os.path.join(directory, f"features-{version}.parquet")
+        if os.path.exists(self.path):
+            self.frame = pd.read_parquet(self.path).set_index("row_hash")
+        else:
+            self.frame = pd.DataFrame(columns=FEATURE_COLUMNS, index=pd.Index([], dtype="uint64", name="row_hash"))
+
+    def missing(self, hashes):
+        return ~pd.Index(hashes).isin(self.frame.index)
+
+    def add(self, hashes, features):
+        new = features.set_axis(pd.Index(hashes, dtype="uint64", name="row_hash"))
+        if self.frame.empty:
+            self.frame = new
+            return
+        self.frame = pd.concat([self.frame, new])
+        self.frame = self.frame[~self.frame.index.duplicated(keep="last")]
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        self.frame.reset_index().to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, self.path)
+
+    def lookup(self, hashes):
+        return self.frame.reindex(pd.Index(hashes, dtype="uint64")).reset_index(drop=True)
+
+
+def rank_candidates(df, features, top=None):
+    """특징을 붙이고 퍼지 TOPSIS 점수/순위를 매긴 DataFrame (순위 순)."""
+    ranked = df.drop(columns=[c for c in FEATURE_COLUMNS + ["fuzzy_topsis_score", "fuzzy_rank"] if c in df.columns])
+    ranked = pd.concat([ranked.reset_index(drop=True), features.reset_index(drop=True)], axis=1)
+    ranked["fuzzy_topsis_score"] = topsis_scores(ranked, DEFAULT_WEIGHTS)
+    ranked = ranked.sort_values("fuzzy_topsis_score", ascending=False, kind="stable").reset_index(drop=True)
+    ranked["fuzzy_rank"] = np.arange(1, len(ranked) + 1)
+    return ranked.head(top) if top else ranked
+
+
+def run(input_path, output_path, data_dir=DATA_DIR, chunk_size=5000, workers=None, top=None,
+        register=False, log=print):
+    """
+    순위를 output_path에 저장. register=True면 data 폴더 manifest에 로컬 파일로 기록해
+    대시보드가 원격 파일로 덮어쓰지 않게 함 (대시보드 파일을 교체할 때만 사용).
+    """
+    start = time.perf_counter()
+    context = build_context(data_dir)
+    checkpoint = FeatureCheckpoint(context["version"], checkpoint_dir(data_dir))
+    chunks, hashes, computed = [], [], 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(context,)) as pool:
+        pending = []
+        for chunk in pd.read_csv(input_path, chunksize=chunk_size):
+            chunk_hashes = row_hashes(chunk)
+            chunks.append(chunk)
+            hashes.append(chunk_hashes)
+            missing = checkpoint.missing(chunk_hashes)
+            if missing.any():
+                pending.append((chunk_hashes[missing], pool.submit(compute_features, chunk[missing])))
+        for missing_hashes, future in pending:
+            checkpoint.add(missing_hashes, future.result())
+            checkpoint.save()
+            computed += len(missing_hashes)
+    df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+    features = checkpoint.lookup(np.concatenate(hashes) if hashes else [])
+    log(f"features: {len(df):,} rows, {computed:,} computed, {len(df) - computed:,} from checkpoint")
+
+    ranked = rank_candidates(df, features, top=top)
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+    tmp_path = f"{output_path}.tmp"
+    ranked.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, output_path)
+    if register:
+        register_local_file(os.path.basename(output_path), data_dir, source="local:utils.score_candidates")
+    log(f"ranked: {len(ranked):,} rows -> {output_path} ({time.perf_counter() - start:.1f}s)")
+    return ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="신규 한국 도서 흥행 예측 점수 배치 계산")
+    parser.add_argument("--data-dir", default=DATA_DIR)
+    parser.add_argument("--input", help=f"후보 도서 CSV (기본: <data-dir>/{INPUT_FILE})")
+    parser.add_argument("--output", help=f"순위 CSV (기본: <data-dir>/{OUTPUT_FILE})")
+    parser.add_argument("--replace-ranked", action="store_true",
+                        help=f"대시보드가 읽는 <data-dir>/{RANKED_FILE}를 결과로 교체")
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 수)")
+    parser.add_argument("--top", type=int, default=None, help="상위 N권만 저장 (--replace-ranked에는 필수)")
+    args = parser.parse_args(argv)
+
+    ranked_path = os.path.join(args.data_dir, RANKED_FILE)
+    if args.replace_ranked:
+        if args.output:
+            parser.error("--replace-ranked와 --output은 함께 쓸 수 없습니다.")
+        # 전체 후보를 그대로 쓰면 대시보드 순위 파일이 카탈로그 전체가 됨
+        if not args.top or args.top < 1:
+            parser.error("--replace-ranked에는 저장할 권수(--top N)를 지정해야 합니다.")
+        output = ranked_path
+    else:
+        output = args.output or os.path.join(args.data_dir, OUTPUT_FILE)
+        if os.path.abspath(output) == os.path.abspath(ranked_path):
+            parser.error(f"대시보드 순위 파일을 바꾸려면 --replace-ranked를 사용하세요: {output}")
+
+    run(args.input or os.path.join(args.data_dir, INPUT_FILE), output,
+        data_dir=args.data_dir, chunk_size=args.chunk_size, workers=args.workers, top=args.top,
+        register=args.replace_ranked)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,177 @@
+"""
+흥행예측도서 순위표 검색 인덱스.
+
+제목/저자/ISBN을 문자 n-gram 역색인으로 미리 만들어 두고,
+검색어마다 후보 행만 확인함. 한글 입력 중인 마지막 글자(예: '한구' → '한국')는
+자모 단위 접두어로 비교하고, 13자리 ISBN은 해시 맵으로 바로 찾음.
+"""
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.isbn_index import normalize_isbn
+from utils.registry import get_dataset
+
+RANKED_FILE = "흥행예측도서_ranked.csv"
+
+_HANGUL_BASE, _HANGUL_END = 0xAC00, 0xD7A3
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+# 겹모음/겹받침은 입력 순서대로 풀어 씀 (예: ㅘ → ㅗㅏ, ㄺ → ㄹㄱ)
+_JUNGSEONG = ["ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+              "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ"]
+_JONGSEONG = ["", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ"]
+_SEPARATOR = "\x00"
+
+
+def to_jamo(text):
+    """한글 음절을 입력 순서의 자모열로 분해. 한글이 아닌 문자는 그대로 둠."""
+    out = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_END:
+            offset = code - _HANGUL_BASE
+            out.append(_CHOSEONG[offset // 588])
+            out.append(_JUNGSEONG[(offset % 588) // 28])
+            out.append(_JONGSEONG[offset % 28])
+        else:
+            out.append(ch)
+    return "".join(out)
+
+
+def _prefix_key(ch):
+    """
+    입력 중인 글자가 될 수 있는 음절들을 묶는 키.
+    받침이 있는 음절은 받침을 뺀 음절로 묶음 (한/할/하 → 하, 곽/과/고 → 고).
+    """
+    code = ord(ch)
+    if _HANGUL_BASE <= code <= _HANGUL_END:
+        offset = code - _HANGUL_BASE
+        jung = (offset % 588) // 28
+        # 겹모음은 첫 모음으로 묶음 (과 → 고)
+        jung = _JUNGSEONG.index(_JUNGSEONG[jung][0])
+        return chr(_HANGUL_BASE + (offset // 588) * 588 + jung * 28)
+    return ch
+
+
+def _choseong_key(ch):
+    """음절의 초성 (자음만 입력된 상태와 맞추기 위함)."""
+    code = ord(ch)
+    if _HANGUL_BASE <= code <= _HANGUL_END:
+        return _CHOSEONG[(code - _HANGUL_BASE) // 588]
+    return ch
+
+
+def _is_jamo(ch):
+    return "\u3131" <= ch <= "\u318e"
+
+
+class SearchIndex:
+    """제목/저자/ISBN 부분 문자열 검색용 역색인. search()는 행 위치 배열을 반환."""
+
+    def __init__(self, titles, authors, isbns):
+        isbn_keys = [normalize_isbn(v) for v in isbns]
+        self._docs = [
+            _SEPARATOR.join(str(v).lower() if pd.notna(v) else "" for v in fields)
+            for fields in zip(titles, authors, isbn_keys)
+        ]
+        self._isbn = {}
+        for row, key in enumerate(isbn_keys):
+            if key:
+                self._isbn.setdefault(key, []).append(row)
+
+        postings = {}
+        for row, doc in enumerate(self._docs):
+            keys = set()
+            for i, ch in enumerate(doc):
+                keys.add(ch)
+                keys.add(_prefix_key(ch))
+                keys.add(_choseong_key(ch))
+                if i + 1 < len(doc):
+                    keys.add(doc[i:i + 2])
+            for key in keys:
+                postings.setdefault(key, []).append(row)
+        self._postings = {key: np.asarray(rows, dtype=np.int32) for key, rows in postings.items()}
+        self._all = np.arange(len(self._docs), dtype=np.int32)
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _candidates(self, head, last):
+        keys = [head[i:i + 2] for i in range(len(head) - 1)] if len(head) > 1 else list(head)
+        keys.append(_prefix_key(last))
+        lists = []
+        for key in set(keys):
+            rows = self._postings.get(key)
+            if rows is None:
+                return self._all[:0]
+            lists.append(rows)
+        lists.sort(key=len)
+        result = lists[0]
+        for rows in lists[1:]:
+            result = np.intersect1d(result, rows, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+    @staticmethod
+    def _matches(doc, head, last_jamo):
+        start = doc.find(head)
+        while start != -1:
+            tail = doc[start + len(head):start + len(head) + 2]
+            if to_jamo(tail).startswith(last_jamo):
+                return True
+            start = doc.find(head, start + 1)
+        return False
+
+    def search(self, query):
+        """대소문자 구분 없이 query를 포함하는 행 위치(오름차순)를 반환."""
+        query = (query or "").strip().lower()
+        if not query:
+            return self._all
+        exact = self._isbn.get(query)
+        if exact is not None and len(query) >= 10:
+            return np.asarray(exact, dtype=np.int32)
+        head, last = query[:-1], query[-1]
+        last_jamo = to_jamo(last)
+        candidates = self._candidates(head, last)
+        docs = self._docs
+        if last_jamo == last and not _is_jamo(last):
+            # 마지막 글자가 한글이 아니면 일반 부분 문자열 비교로 충분
+            matches = (row for row in candidates if query in docs[row])
+        else:
+            matches = (row for row in candidates
+                       if query in docs[row] or self._matches(docs[row], head, last_jamo))
+        return np.fromiter(matches, dtype=np.int32)
+
+
+@st.cache_resource(show_spinner=False)
+def get_ranked_search_index():
+    """흥행예측도서 순위표용 검색 인덱스 (프로세스 단위 공유)."""
+    df = get_dataset(RANKED_FILE, columns=["제목", "저자", "ISBN"])
+    if df.empty:
+        return SearchIndex([], [], [])
+    return SearchIndex(df["제목"].tolist(), df["저자"].tolist(), df["ISBN"].tolist())
+
+
+def benchmark(n_rows=200_000, queries=("소년", "채식", "한구", "작가1", "9788900000123", "night")):
+    df = get_dataset(RANKED_FILE, columns=["제목", "저자", "ISBN"])
+    reps = max(1, n_rows // max(len(df), 1))
+    big = pd.concat([df] * reps, ignore_index=True)
+    start = time.perf_counter()
+    index = SearchIndex(big["제목"].tolist(), big["저자"].tolist(), big["ISBN"].tolist())
+    print(f"index build: {len(big):,} rows in {time.perf_counter() - start:.2f}s")
+    for query in queries:
+        start = time.perf_counter()
+        hits = index.search(query)
+        indexed_ms = (time.perf_counter() - start) * 1000
+        start = time.perf_counter()
+        big[big["제목"].str.contains(query, case=False, na=False)
+            | big["저자"].str.contains(query, case=False, na=False)
+            | big["ISBN"].astype(str).str.contains(query, case=False, na=False)]
+        scan_ms = (time.perf_counter() - start) * 1000
+        print(f"{query!r:>18}: {len(hits):>7,} hits  index {indexed_ms:8.3f} ms  str.contains {scan_ms:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
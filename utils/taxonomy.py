@@ -0,0 +1,250 @@
+"""
+장르/대표 속성(전개, 등장인물, 주제, 배경, 분위기) 분류 체계.
+
+값마다 한국어 이름과 이모지를 한 곳에서 관리하고, 표시 형식별 라벨 배열을 분류 순서대로
+미리 만들어 둠. 라벨을 붙일 때는 행마다 함수를 부르지 않고, 컬럼을 코드(category 코드나
+factorize 결과)로 바꾼 뒤 고유값 단위 라벨표에서 코드로 take만 함.
+분류에 없는 값은 원래 값을 그대로 쓰고, 결측은 NaN으로 둠.
+
+    python -m utils.taxonomy   # 행 단위 lambda와 코드 take 비교
+"""
+import time
+import numpy as np
+import pandas as pd
+
+# 표시 형식 -> 라벨 형식
+LABEL_FORMATS = {
+    "kor": "{kor}",
+    "emoji": "{emoji} {kor}",
+    "stacked": "{emoji}<br>{kor}",
+}
+
+GENRE_KOR = {
+    'Thriller': '스릴러', 'Mystery': '미스터리', 'Crime Fiction': '범죄소설', 'Suspense': '서스펜스', 'Romance': '로맨스',
+    'Fantasy': '판타지', 'Magical Realism': '마술적 사실주의', 'Mythic Fiction': '신화소설', 'Adventure': '모험',
+    'Historical Fiction': '역사소설', 'Historical & Political Fiction': '역사/정치소설', 'Science Fiction': 'SF',
+    'Philosophical Fiction': '철학소설', 'Contemporary Fiction': '현대소설', 'Literary Fiction': '문학소설',
+    'Family_Saga': '가족서사', 'Coming-of-Age': '성장소설'
+}
+
+# K-콘텐츠(IMDb) 장르 분포에 쓰는 짧은 이름
+GENRE_KOR_SHORT = {
+    'Thriller': '스릴러', 'Mystery': '미스터리', 'Crime Fiction': '범죄', 'Suspense': '서스펜스', 'Romance': '로맨스',
+    'Fantasy': '판타지', 'Magical Realism': '마술적 사실주의', 'Mythic Fiction': '신화', 'Adventure': '모험',
+    'Historical Fiction': '역사', 'Historical & Political Fiction': '역사/정치', 'Science Fiction': 'SF',
+    'Philosophical Fiction': '철학', 'Contemporary Fiction': '현대', 'Literary Fiction': '문학',
+    'Family_Saga': '가족서사', 'Coming-of-Age': '성장'
+}
+
+GENRE_EMOJI = {
+    'Thriller': '🔪', 'Mystery': '🔍', 'Crime Fiction': '⚖️', 'Suspense': '⏳', 'Romance': '❤️',
+    'Fantasy': '✨', 'Magical Realism': '🧙‍♂️', 'Mythic Fiction': '🧚‍♀️', 'Adventure': '🗺️',
+    'Historical Fiction': '🏛️', 'Historical & Political Fiction': '🏛️', 'Science Fiction': '🚀',
+    'Philosophical Fiction': '🤔', 'Contemporary Fiction': '🏙️', 'Literary Fiction': '📖',
+    'Family_Saga': '👨‍👩‍👧‍👦', 'Coming-of-Age': '🌱'
+}
+
+# 장르 분포 차트 색상
+GENRE_COLORS = {
+    'Thriller': '#A3C9A8', 'Mystery': '#84B1BE', 'Crime Fiction': '#F2D388', 'Suspense': '#C98474', 'Romance': '#8E7DBE',
+    'Fantasy': '#F5B7B1', 'Magical Realism': '#AED6F1', 'Mythic Fiction': '#F9E79F', 'Adventure': '#D7BDE2',
+    'Historical Fiction': '#A2D9CE', 'Historical & Political Fiction': '#FADBD8', 'Science Fiction': '#F5CBA7',
+    'Philosophical Fiction': '#D2B4DE', 'Contemporary Fiction': '#A9CCE3', 'Literary Fiction': '#A3E4D7',
+    'Family_Saga': '#B7B7B7', 'Coming-of-Age': '#FFD700'
+}
+
+PLOT_KOR = {
+    'survival': '생존', 'identity_crisis': '정체성의 혼란', 'transformation': '변화', 'coming_of_age': '성장', 'revenge': '복수',
+    'rebellion': '반란', 'family_secrets': '가족의 비밀', 'forgiveness': '용서', 'curse': '저주', 'mystery_solving': '미스터리 해결',
+    'love_story': '사랑 이야기', 'war': '전쟁', 'discovery': '발견', 'sacrifice': '희생', 'hero_journey': '영웅의 여정',
+    'political_intrigue': '정치적 음모', 'betrayal': '배신', 'forbidden_love': '금지된 사랑', 'quest': '임무', 'exploration': '탐험',
+    'redemption': '속죄', 'fish_out_of_water': '낯선 환경에서의 갈등', 'second_chance': '두 번째 기회', 'rags_to_riches': '신분 상승 이야기',
+    'magic_system': '마법', 'prophecy': '예언', 'enemies_to_lovers': "적에서 연인으로"
+}
+
+PLOT_EMOJI = {
+    'survival': '🏕️', 'identity_crisis': '🎭', 'transformation': '🦋', 'coming_of_age': '🌱', 'revenge': '😠', 'rebellion': '✊',
+    'family_secrets': '🗝️', 'forgiveness': '🤝', 'curse': '🧙‍♂️', 'mystery_solving': '🕵️', 'love_story': '❤️', 'war': '⚔️', 'discovery': '💡',
+    'sacrifice': '🕊️', 'hero_journey': '🦸', 'political_intrigue': '🕴️', 'betrayal': '💔', 'forbidden_love': '🚫❤️', 'quest': '🗺️', 'exploration': '🧭',
+    'redemption': '🙏', 'fish_out_of_water': '😰', 'second_chance': '🔄', 'rags_to_riches': '📈', 'magic_system': '🔮', 'prophecy': '👁️', 'enemies_to_lovers': '⚔️❤️'
+}
+
+CHARACTER_KOR = {
+    "survivor": "생존자", "ordinary_person": "평범한 인물", "outsider": "국외자", "artist": "예술가", "student": "학생",
+    "anti_hero": "반(反)영웅", "reluctant_hero": "마지못해 영웅이 된 인물", "magic_user": "마법사", "detective": "탐정", "royalty": "왕족",
+    "spy": "스파이", "love_interest": "사랑의 대상", "teacher": "교사", "soldier": "군인", "leader": "리더", "complex_antagonist": "입체적 악역",
+    "hero": "영웅", "mentor_figure": "멘토", "doctor": "의사", "journalist": "기자", "criminal": "범죄자", "scientist": "과학자", "writer": "작가",
+    "warrior": "용사", "lawyer": "변호사", "rebel": "반역자", "scholar": "학자", "the innocent": "무고한 인물"
+}
+
+CHARACTER_EMOJI = {
+    'ordinary_person': '🧑', 'survivor': '💪', 'outsider': '🚶', 'reluctant_hero': '🦸', 'love_interest': '💕',
+    'anti_hero': '😈', 'mentor_figure': '🧑‍🏫', 'artist': '🎨', 'student': '🎒', 'magic_user': '🧙',
+    'detective': '🕵️', 'royalty': '👑', 'spy': '🕶️', 'teacher': '👩‍🏫', 'soldier': '🪖', 'leader': '🧑‍💼',
+    'complex_antagonist': '🦹', 'hero': '🦸', 'doctor': '👩‍⚕️', 'journalist': '📰', 'criminal': '🚓',
+    'scientist': '🔬', 'writer': '✍️', "warrior": "🛡️", "lawyer": "👩‍⚖️", "rebel": "✊", "scholar": "🎓", "the innocent": "😇"
+}
+
+THEME_KOR = {
+    "survival_instinct": "생존 본능", "social_justice": "사회 정의", "personal_growth": "개인적 성장", "truth_seeking": "진실 추구", "justice": "정의", "family_bonds": "가족 유대",
+    "power_corruption": "권력의 부패", "identity_search": "정체성 탐색", "freedom": "자유", "environmental_issues": "환경 문제", "good_vs_evil": "선과 악", "belonging": "소속감",
+    "cultural_clash": "문화 충돌", "technology_impact": "기술의 영향", "love_story": "사랑 이야기", "moral_dilemma": "도덕적 딜레마", "sacrifice_for_others": "타인을 위한 희생",
+    "tradition_vs_change": "전통과 변화의 갈등", "forgiveness": "용서", "love": "사랑", "legacy": "유산", "responsibility": "책임",
+    "revenge": "복수", "loyalty": "충성심"
+}
+
+THEME_EMOJI = {
+    'personal_growth': '🌱', 'social_justice': '⚖️', 'identity_search': '❓', 'family_bonds': '👨‍👩‍👧‍👦', 'moral_dilemma': '🤔',
+    'cultural_clash': '🌍', 'survival_instinct': '🧠', 'truth_seeking': '🔎', 'justice': '🧑‍⚖️', 'power_corruption': '🤫', 'freedom': '🕊️',
+    'environmental_issues': '🌳', 'good_vs_evil': '⚔️', 'belonging': '🫂', 'technology_impact': '🤖', 'love_story': '❤️', 'sacrifice_for_others': '🕊️',
+    'tradition_vs_change': '🔄', 'forgiveness': '🤝', 'love': '💖', 'legacy': '🏛️', 'responsibility': '👩‍⚖️', "revenge": "🗡️", "loyalty": "🙇‍♂️"
+}
+
+SETTING_KOR = {
+    "contemporary": "현대", "foreign_country": "외국", "rural": "시골", "dystopian_society": "디스토피아 사회", "magical_realm": "마법 세계",
+    "big_city": "대도시", "historical_medieval": "중세 시대", "fantasy_world": "판타지 세계", "historical_victorian": "빅토리아 시대", "historical_1920s": "1920년대",
+    "historical": "역사적 배경", "near_future": "가까운 미래", "historical_wwii": "2차 세계대전", "far_future": "먼 미래", "small_town": "소도시", "historical_1970s": "1970년대",
+    "prison": "감옥", "school_setting": "학교", "workplace": "직장", "post_apocalyptic": "포스트 아포칼립스", "historical_1950s": "1950년대", "historical_1980s": "1980년대",
+    "upper_class": "상류층", "military": "군대", "other_planet": "다른 행성", "working_class": "노동자 계급", "historical_1930s": "1930년대", "island": "섬",
+    "suburban": "교외 지역", "historical_1960s": "1960년대", "hospital": "병원"
+}
+
+SETTING_EMOJI = {
+    'contemporary': '🌇', 'foreign_country': '✈️', 'rural': '🌾', 'dystopian_society': '🏭', 'magical_realm': '🪄',
+    'big_city': '🚕', 'historical_medieval': '🏰', 'fantasy_world': '🐉', 'historical_victorian': '🎩', 'historical_1920s': '🎷',
+    'historical': '📜', 'near_future': '🤖', 'historical_wwii': '💣', 'far_future': '🚀', 'small_town': '🏘️',
+    'historical_1970s': '🕺', 'prison': '🚔', 'school_setting': '🏫', 'workplace': '💼', 'post_apocalyptic': '☢️',
+    'historical_1950s': '🎙️', 'historical_1980s': '📼', 'upper_class': '💎', 'military': '🎖️', 'other_planet': '🪐',
+    'working_class': '🔧', 'historical_1930s': '🎞️', 'island': '🏝️', "suburban": "🏞️", "historical_1960s": "📺", "hospital": "🏥"
+}
+
+TONE_KOR = {
+    "intense": "강렬한", "serious": "진지한", "emotional": "감정적인", "haunting": "잊혀지지 않는", "dark": "어두운", "suspenseful": "긴장감 있는", "poetic": "시적인",
+    "dramatic": "극적인", "hopeful": "희망적인", "whimsical": "기발한", "action_packed": "액션이 풍부한", "humorous": "유머러스한", "melancholic": "우울한", "uplifting": "격려하는",
+    "fast_paced": "빠른 전개", "philosophical": "철학적인", "eerie": "으스스한", "mysterious": "신비로운", "gentle": "부드러운", "nostalgic": "향수를 불러일으키는", "pessimistic": "비관적인",
+    "heartening": "가슴 벅찬", "gripping": "사로잡는", "sexy": "관능적인", "heartwarming": "마음 따뜻해지는", "tense": "긴장감 있는", "warmhearted": "감동적인"
+}
+
+TONE_EMOJI = {
+    'intense': '🔥', 'serious': '🧐', 'emotional': '😭', 'haunting': '👻', 'dark': '🌑', 'suspenseful': '😱', 'poetic': '🖋️',
+    'dramatic': '🎭', 'hopeful': '🌅', 'whimsical': '🦄', 'action_packed': '💥', 'humorous': '🤣', 'melancholic': '😔',
+    'uplifting': '🌈', 'fast_paced': '⚡', 'philosophical': '🤔', 'eerie': '🕸️', 'mysterious': '🕵️‍♂️', 'gentle': '🕊️', 'nostalgic': '📻', 'pessimistic': '🙄',
+    "heartening": "💖", "gripping": "🤩", "sexy": "💋", "heartwarming": "🥰", "tense": "😬", "warmhearted": "🤗"
+}
+
+
+def codes_of(series):
+    """(행별 코드, 고유값). category면 기존 코드를 그대로 쓰고, 결측은 코드 -1."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return series.cat.codes.to_numpy(), series.cat.categories
+    return pd.factorize(series)
+
+
+def take_labels(series, table):
+    """
+    고유값 라벨표(table, codes_of의 고유값 순서)를 코드로 take. 결측은 NaN.
+    category 컬럼은 라벨이 겹치지 않으면 코드를 그대로 두고 범주 이름만 라벨로 바꾼 category를 반환함
+    (Series.map과 같은 결과라 value_counts 동률 순서도 그대로).
+    """
+    codes, _ = codes_of(series)
+    if isinstance(series.dtype, pd.CategoricalDtype) and len(set(table)) == len(table):
+        labels = pd.Categorical.from_codes(codes, categories=table, ordered=series.cat.ordered)
+        return pd.Series(labels, index=series.index, name=series.name)
+    # 마지막 칸을 NaN으로 두면 코드 -1(결측)이 그대로 NaN을 가리킴
+    lookup = np.empty(len(table) + 1, dtype=object)
+    lookup[:-1] = table
+    lookup[-1] = np.nan
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+def map_labels(series, labels):
+    """dict(값 -> 라벨)로 라벨을 붙임. dict에 없는 값은 원래 값."""
+    _, uniques = codes_of(series)
+    return take_labels(series, [labels.get(u, u) for u in uniques])
+
+
+class Taxonomy:
+    """
+    분류 하나 (예: 장르). values 순서가 분류 코드이고, 표시 형식별 라벨 배열을 같은 순서로 미리 만듦.
+    missing_emoji는 이모지가 없는 값에 쓸 이모지 (페이지마다 다름).
+    """
+
+    def __init__(self, name, column, kor, emoji, colors=None):
+        self.name = name
+        self.column = column
+        self.kor = kor
+        self.emoji = emoji
+        self.colors = colors or {}
+        self.values = pd.Index(list(dict.fromkeys([*kor, *emoji])))
+        self._labels = {}
+
+    def _format(self, value, style, missing_emoji):
+        return LABEL_FORMATS[style].format(emoji=self.emoji.get(value, missing_emoji), kor=self.kor.get(value, value))
+
+    def label_array(self, style="emoji", missing_emoji=""):
+        """분류 코드 순서의 라벨 배열 (형식별로 한 번만 만듦)."""
+        key = (style, missing_emoji)
+        if key not in self._labels:
+            self._labels[key] = np.array([self._format(v, style, missing_emoji) for v in self.values], dtype=object)
+        return self._labels[key]
+
+    def encode(self, values):
+        """값 -> 분류 코드. 분류에 없는 값은 -1."""
+        return self.values.get_indexer(values)
+
+    def label(self, value, style="emoji", missing_emoji=""):
+        """값 하나의 라벨 (위젯 format_func 등). 결측은 그대로 반환."""
+        if pd.isna(value):
+            return value
+        code = self.encode([value])[0]
+        return self.label_array(style, missing_emoji)[code] if code >= 0 else self._format(value, style, missing_emoji)
+
+    def labels(self, series, style="emoji", missing_emoji=""):
+        """series 전체의 라벨. 고유값을 분류 코드로 바꿔 라벨 배열에서 take한 뒤, 행에는 다시 코드로 take."""
+        _, uniques = codes_of(series)
+        codes = self.encode(uniques)
+        table = self.label_array(style, missing_emoji).take(np.maximum(codes, 0))
+        for i in np.flatnonzero(codes < 0):
+            table[i] = self._format(uniques[i], style, missing_emoji)
+        return take_labels(series, table)
+
+    def label_map(self, style="emoji", missing_emoji=""):
+        """값 -> 라벨 dict."""
+        return dict(zip(self.values, self.label_array(style, missing_emoji)))
+
+    def color_map(self, style="emoji", missing_emoji=""):
+        """라벨 -> 색상 dict (라벨로 그리는 차트의 color_discrete_map)."""
+        return {label: self.colors[v] for v, label in self.label_map(style, missing_emoji).items() if v in self.colors}
+
+
+GENRE = Taxonomy("장르", "primary_genre", GENRE_KOR, GENRE_EMOJI, GENRE_COLORS)
+GENRE_SHORT = Taxonomy("장르", "primary_genre", GENRE_KOR_SHORT, GENRE_EMOJI, GENRE_COLORS)
+PLOT = Taxonomy("전개", "primary_plot", PLOT_KOR, PLOT_EMOJI)
+CHARACTER = Taxonomy("등장인물", "primary_character", CHARACTER_KOR, CHARACTER_EMOJI)
+THEME = Taxonomy("주제", "primary_theme", THEME_KOR, THEME_EMOJI)
+SETTING = Taxonomy("배경", "primary_setting", SETTING_KOR, SETTING_EMOJI)
+TONE = Taxonomy("분위기", "primary_tone", TONE_KOR, TONE_EMOJI)
+
+# 특징 분석 화면의 카테고리 이름 -> 분류
+ATTRIBUTE_TAXONOMIES = {t.name: t for t in (GENRE, PLOT, CHARACTER, THEME, SETTING, TONE)}
+
+
+def benchmark(n_rows=1_000_000, repeat=5):
+    rng = np.random.default_rng(0)
+    values = [*TONE.values, "unknown_tone", np.nan]
+    series = pd.Series(rng.choice(np.array(values, dtype=object), n_rows))
+    for name, s in (("object", series), ("category", series.astype("category"))):
+        before = after = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            expected = s.map(lambda x: f"{TONE.emoji.get(x, '')} {TONE.kor.get(x, x)}" if pd.notna(x) else x)
+            before = min(before, time.perf_counter() - start)
+            start = time.perf_counter()
+            result = TONE.labels(s)
+            after = min(after, time.perf_counter() - start)
+        assert result.astype(object).equals(expected.astype(object))
+        print(f"{name:>8}: lambda {before * 1000:8.1f} ms  take {after * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
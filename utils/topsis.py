@@ -0,0 +1,270 @@
+"""
+퍼지 TOPSIS 점수 계산.
+
+기준값을 열별 최댓값으로 정규화하고, 언어 변수(매우 낮음~매우 높음)로 고른 가중치를
+삼각 퍼지수(l, m, u)로 곱한 뒤 퍼지 이상해 (1, 1, 1)과 반이상해 (0, 0, 0)까지의
+정점 거리로 근접계수 CC = D- / (D+ + D-)를 구함. 모든 도서를 한 번에 배열 연산으로 계산.
+
+앱의 계산식은 배포된 흥행예측도서_ranked.csv의 fuzzy_topsis_score를 만든 원래 계산과
+아직 맞춰지지 않았으므로, 기본 가중치에서는 배포된 점수/순위를 그대로 쓰고 사용자가 가중치를
+바꿨을 때만 이 모듈로 다시 계산함 ('앱 계산'으로 표시). --check가 통과하기 전(model_calibrated()가
+False)에는 앱 계산 결과를 보정 전 참고값으로 안내함.
+
+    python -m utils.topsis           # 10만 건 재계산 시간 측정
+    python -m utils.topsis --check   # 배포된 점수와의 일치도 (기준 미달이면 종료 코드 1)
+"""
+import argparse
+import time
+import numpy as np
+import pandas as pd
+import streamlit as st
+from utils.ranking import sort_permutation
+from utils.registry import get_dataset
+
+RANKED_FILE = "흥행예측도서_ranked.csv"
+# 평가 기준 (모두 클수록 좋은 기준)
+CRITERIA = ['salespoint', 'nyb_max_s', 'nyt_genre_score', 'imdb_genre_score']
+
+# 언어 변수 -> 삼각 퍼지 가중치 (Chen, 2000)
+LINGUISTIC_WEIGHTS = {
+    "매우 낮음": (0.0, 0.0, 0.1),
+    "낮음": (0.0, 0.1, 0.3),
+    "다소 낮음": (0.1, 0.3, 0.5),
+    "보통": (0.3, 0.5, 0.7),
+    "다소 높음": (0.5, 0.7, 0.9),
+    "높음": (0.7, 0.9, 1.0),
+    "매우 높음": (0.9, 1.0, 1.0),
+}
+DEFAULT_WEIGHTS = {criterion: "높음" for criterion in CRITERIA}
+# 순위 안정성 계산량 상한 (도서 수 x 표본 수). 10만 권이면 표본 200개까지
+MAX_STABILITY_CELLS = 20_000_000
+MIN_STABILITY_SAMPLES = 50
+# --check 통과 기준: 기본 가중치 점수와 배포된 점수의 spearman 상관계수
+CALIBRATION_MIN_SPEARMAN = 0.99
+
+
+def fuzzy_weights(weights, criteria=CRITERIA):
+    """{기준: 언어 변수 또는 (l, m, u)} -> (기준 수, 3) 배열."""
+    rows = []
+    for criterion in criteria:
+        weight = weights.get(criterion, DEFAULT_WEIGHTS[criterion])
+        rows.append(LINGUISTIC_WEIGHTS[weight] if isinstance(weight, str) else weight)
+    return np.asarray(rows, dtype="float64")
+
+
+def normalize(matrix):
+    """열별 최댓값으로 나눈 정규화 행렬. 결측값은 0 (가장 불리한 값)으로 둠."""
+    matrix = np.asarray(matrix, dtype="float64")
+    col_max = np.nanmax(np.where(np.isnan(matrix), -np.inf, matrix), axis=0)
+    col_max = np.where(np.isfinite(col_max) & (col_max > 0), col_max, 1.0)
+    return np.nan_to_num(matrix / col_max, nan=0.0).clip(0.0, 1.0)
+
+
+def closeness(matrix, weights):
+    """
+    정규화된 기준 행렬 (도서 수, 기준 수)와 퍼지 가중치 (기준 수, 3)로 근접계수를 계산.
+    정점 거리 d(a, b) = sqrt(mean_k (a_k - b_k)^2)를 기준별로 더해 D+, D-를 구함.
+    기준값 r이 실수이므로 가중 퍼지수 (r*l, r*m, r*u)의 거리는 가중치의 1, 2차 평균
+    p = mean(w), q = mean(w^2)로 정리됨: d- = r*sqrt(q), d+ = sqrt(r^2*q - 2*r*p + 1).
+    """
+    p = weights.mean(axis=1)
+    q = (weights ** 2).mean(axis=1)
+    d_minus = matrix @ np.sqrt(q)
+    d_plus = np.sqrt(np.maximum(matrix * matrix * q - 2.0 * matrix * p + 1.0, 0.0)).sum(axis=1)
+    total = d_plus + d_minus
+    return np.divide(d_minus, total, out=np.zeros_like(total), where=total > 0)
+
+
+def criteria_matrix(df, criteria=CRITERIA):
+    """DataFrame의 기준 컬럼을 (도서 수, 기준 수) 배열로 꺼냄. 없는 기준은 결측으로 둠."""
+    columns = [
+        pd.to_numeric(df[c], errors="coerce").to_numpy(dtype="float64") if c in df.columns
+        else np.full(len(df), np.nan)
+        for c in criteria
+    ]
+    return np.column_stack(columns) if len(df) else np.empty((0, len(criteria)))
+
+
+def topsis_scores(df, weights, criteria=CRITERIA):
+    """DataFrame의 기준 컬럼으로 근접계수 배열을 계산."""
+    return closeness(normalize(criteria_matrix(df, criteria)), fuzzy_weights(weights, criteria))
+
+
+@st.cache_resource(show_spinner=False)
+def get_criteria_matrix():
+    """흥행예측도서 순위표의 정규화된 기준 행렬 (프로세스 단위 공유)."""
+    return normalize(criteria_matrix(get_dataset(RANKED_FILE, columns=CRITERIA)))
+
+
+def is_default(weights):
+    return all(weights.get(c, DEFAULT_WEIGHTS[c]) == DEFAULT_WEIGHTS[c] for c in CRITERIA)
+
+
+def ranked_scores(weights):
+    """
+    가중치를 바꿨을 때의 흥행예측도서 앱 계산 근접계수.
+    기본 가중치면 None (배포된 fuzzy_topsis_score/fuzzy_rank를 그대로 사용).
+    """
+    if is_default(weights):
+        return None
+    return closeness(get_criteria_matrix(), fuzzy_weights(weights))
+
+
+@st.cache_resource(show_spinner=False)
+def model_calibrated():
+    """앱 계산 모델이 기본 가중치에서 배포된 점수를 재현하는지 (--check 통과 여부)."""
+    df = get_dataset(RANKED_FILE, columns=CRITERIA + ["fuzzy_topsis_score", "fuzzy_rank"])
+    if df.empty or "fuzzy_topsis_score" not in df.columns:
+        return False
+    return bool(shipped_agreement(df)["spearman"] >= CALIBRATION_MIN_SPEARMAN)
+
+
+def shipped_agreement(df):
+    """
+    기본 가중치로 계산한 점수와 df의 배포된 fuzzy_topsis_score의 일치도.
+    pearson / spearman 상관계수와 최대 절대 오차, 배포된 fuzzy_rank와 순위가 같은 도서 비율.
+    """
+    computed = topsis_scores(df, DEFAULT_WEIGHTS)
+    shipped = pd.to_numeric(df["fuzzy_topsis_score"], errors="coerce").to_numpy(dtype="float64")
+    valid = ~np.isnan(shipped)
+    computed, shipped = pd.Series(computed[valid]), pd.Series(shipped[valid])
+    result = {
+        "books": int(valid.sum()),
+        "pearson": computed.corr(shipped),
+        # scipy 없이 순위의 pearson으로 spearman 계산
+        "spearman": computed.rank().corr(shipped.rank()),
+        "max_abs_error": float((computed - shipped).abs().max()) if len(shipped) else np.nan,
+    }
+    if "fuzzy_rank" in df.columns:
+        rank = computed.rank(ascending=False, method="first").to_numpy()
+        result["rank_match"] = float(np.mean(rank == pd.to_numeric(df["fuzzy_rank"], errors="coerce")[valid].to_numpy()))
+    return result
+
+
+def rank_stability(matrix, weights, n_samples=1000, top_n=10, concentration=20.0, chunk=32, seed=0,
+                   anchor_ranks=None):
+    """
+    가중치 불확실성에 대한 몬테카를로 순위 안정성.
+    현재 가중치 비중을 평균으로 하는 Dirichlet 분포에서 가중치 벡터를 n_samples개 뽑아
+    각 퍼지 가중치를 비중 비율만큼 늘이거나 줄인 뒤, chunk개 표본씩 한 번에 근접계수와 순위를 계산함.
+    concentration이 클수록 현재 가중치 근처에서만 표본을 뽑음.
+    첫 표본은 화면의 순위 그대로로, anchor_ranks(도서 순서의 1부터 시작하는 순위)를 주면 그 순위를,
+    없으면 현재 가중치로 순위표와 같은 방식(근접계수, 안정 정렬)으로 매긴 순위를 씀.
+    그래서 순위 범위는 항상 화면의 순위를 포함함. 동점은 모든 표본에서 도서 순서로 정렬함.
+    도서 순서대로 rank_min, rank_max, rank_mean, top_n_prob 컬럼의 DataFrame을 반환.
+    """
+    n_books, n_criteria = matrix.shape
+    rng = np.random.default_rng(seed)
+    # 삼각 퍼지수의 평균으로 비중을 잡음 ('매우 낮음'처럼 m = 0인 가중치도 0이 아니도록)
+    share = weights.mean(axis=1)
+    share = share / share.sum() if share.sum() > 0 else np.full(n_criteria, 1.0 / n_criteria)
+    samples = rng.dirichlet(concentration * n_criteria * share, size=max(n_samples - 1, 0))
+    fuzzy = np.clip(weights[None, :, :] * (samples / share)[:, :, None], 0.0, 1.0)
+    p_all, q_all = fuzzy.mean(axis=2), (fuzzy ** 2).mean(axis=2)
+
+    rank_min = np.full(n_books, n_books, dtype=np.int64)
+    rank_max = np.zeros(n_books, dtype=np.int64)
+    rank_sum = np.zeros(n_books, dtype=np.float64)
+    top_hits = np.zeros(n_books, dtype=np.int64)
+    if n_samples > 0:
+        if anchor_ranks is not None:
+            current = np.asarray(anchor_ranks, dtype=np.int64)
+        else:
+            current = np.empty(n_books, dtype=np.int64)
+            current[sort_permutation(closeness(matrix, weights), False)] = np.arange(1, n_books + 1)
+        rank_min, rank_max, rank_sum = current.copy(), current.copy(), current.astype(np.float64)
+        top_hits += current <= top_n
+    columns = np.ascontiguousarray(matrix.T, dtype=np.float32)
+    positions = np.broadcast_to(np.arange(1, n_books + 1, dtype=np.int32), (chunk, n_books))
+    for start in range(0, len(samples), chunk):
+        p = p_all[start:start + chunk].astype(np.float32)
+        q = q_all[start:start + chunk].astype(np.float32)
+        # (표본 수, 도서 수) 행렬로 D-, D+를 한 번에 계산
+        d_minus = np.sqrt(q) @ columns
+        d_plus = np.zeros_like(d_minus)
+        for j in range(n_criteria):
+            r = columns[j]
+            d_plus += np.sqrt(np.maximum(q[:, j:j + 1] * (r * r) - 2.0 * p[:, j:j + 1] * r + 1.0, 0.0))
+        total = d_plus + d_minus
+        scores = np.divide(d_minus, total, out=np.zeros_like(total), where=total > 0)
+        order = np.argsort(-scores, axis=1, kind="stable")
+        ranks = np.empty(order.shape, dtype=np.int32)
+        np.put_along_axis(ranks, order, positions[:len(order)], axis=1)
+        np.minimum(rank_min, ranks.min(axis=0), out=rank_min)
+        np.maximum(rank_max, ranks.max(axis=0), out=rank_max)
+        rank_sum += ranks.sum(axis=0)
+        top_hits += (ranks <= top_n).sum(axis=0)
+    return pd.DataFrame({
+        "rank_min": rank_min.astype(np.int32),
+        "rank_max": rank_max.astype(np.int32),
+        "rank_mean": rank_sum / max(n_samples, 1),
+        "top_n_prob": top_hits / max(n_samples, 1),
+    })
+
+
+def capped_samples(n_books, n_samples):
+    """계산량 상한(MAX_STABILITY_CELLS)에 맞춘 표본 수."""
+    return max(MIN_STABILITY_SAMPLES, min(n_samples, MAX_STABILITY_CELLS // max(n_books, 1)))
+
+
+def shipped_ranks():
+    """배포된 fuzzy_rank (도서 순서). 없거나 1..N 순위가 아니면 None."""
+    df = get_dataset(RANKED_FILE, columns=["fuzzy_rank"])
+    if "fuzzy_rank" not in df.columns:
+        return None
+    ranks = pd.to_numeric(df["fuzzy_rank"], errors="coerce")
+    if ranks.isna().any() or not (ranks.between(1, len(ranks))).all():
+        return None
+    return ranks.to_numpy(dtype=np.int64)
+
+
+@st.cache_resource(show_spinner=False, max_entries=8)
+def get_rank_stability(weight_terms, n_samples=1000, top_n=10):
+    """
+    흥행예측도서 전체의 순위 안정성. weight_terms는 CRITERIA 순서의 언어 변수 튜플.
+    기본 가중치면 순위표와 같이 배포된 fuzzy_rank를 기준 순위로 씀.
+    표본 수는 capped_samples로 줄이고, 같은 가중치/표본 수/N 조합은 프로세스 단위로 재사용함.
+    """
+    matrix = get_criteria_matrix()
+    weights = dict(zip(CRITERIA, weight_terms))
+    anchor = shipped_ranks() if is_default(weights) else None
+    return rank_stability(matrix, fuzzy_weights(weights), n_samples=capped_samples(len(matrix), n_samples),
+                          top_n=top_n, anchor_ranks=anchor)
+
+
+def benchmark(n_rows=100_000, repeat=5):
+    rng = np.random.default_rng(0)
+    matrix = normalize(rng.gamma(2.0, 1.0, size=(n_rows, len(CRITERIA))))
+    weights = fuzzy_weights({"salespoint": "보통", "nyb_max_s": "매우 높음"})
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        scores = closeness(matrix, weights)
+        np.argsort(-scores, kind="stable")
+        best = min(best, time.perf_counter() - start)
+    print(f"{n_rows:,} books: score + rank in {best * 1000:.1f} ms")
+    n_samples = capped_samples(n_rows, 1000)
+    start = time.perf_counter()
+    rank_stability(matrix, weights, n_samples=n_samples)
+    print(f"{n_rows:,} books x {n_samples:,} weight samples: rank stability in {time.perf_counter() - start:.1f} s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="퍼지 TOPSIS 점수 계산 측정/검증")
+    parser.add_argument("--check", action="store_true",
+                        help="기본 가중치 점수가 배포된 fuzzy_topsis_score를 재현하는지 확인")
+    parser.add_argument("--min-corr", type=float, default=CALIBRATION_MIN_SPEARMAN, help="--check 통과 기준 (spearman)")
+    args = parser.parse_args(argv)
+    if not args.check:
+        benchmark()
+        return 0
+    result = shipped_agreement(get_dataset(RANKED_FILE, columns=CRITERIA + ["fuzzy_topsis_score", "fuzzy_rank"]))
+    print(", ".join(f"{k}={v:.4f}" if isinstance(v, float) else f"{k}={v}" for k, v in result.items()))
+    if not result["spearman"] >= args.min_corr:
+        print(f"기본 가중치 점수가 배포된 점수를 재현하지 못합니다 (spearman < {args.min_corr}).")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,25 @@
+"""
+페이지 공용 위젯.
+"""
+import streamlit as st
+
+# 분포 차트 탭 라벨 -> 차트 종류 (figure 캐시 키)
+CHART_TABS = {"도넛 차트": "donut", "트리맵": "treemap", "버블 차트": "bubble"}
+
+
+def lazy_tabs(labels, key):
+    """
+    st.tabs 대신 쓰는 탭 선택 컨트롤. 선택된 라벨만 반환함.
+    st.tabs는 모든 탭 내용을 매번 계산/전송하지만, 이 방식은 선택된 탭만 그림.
+    """
+    labels = list(labels)
+    last_key = f"{key}_last"
+    last = st.session_state.get(last_key, labels[0])
+    selected = st.segmented_control(
+        "차트 종류", labels, default=last, key=key, label_visibility="collapsed"
+    )
+    if selected is None:
+        # 선택된 버튼을 다시 눌러 선택이 풀린 경우 직전 탭을 유지
+        selected = last
+    st.session_state[last_key] = selected
+    return selected